@@ -257,14 +257,21 @@ if __name__ == "__main__":
 
 # app.py
 import datetime
+import json
 from calendar_utils import (
-    get_events_by_date, list_events_for_month, create_event,
-    delete_event_by_exact_match, is_conflict, suggest_alternative,
-    get_event_time_by_title, find_free_slots_for_day
+    event_store, get_events_by_date, iter_events_for_month, iter_events_for_year, create_event,
+    delete_event_by_exact_match, delete_events_in_range, is_conflict,
+    suggest_alternative, get_event_time_by_title, find_free_slots_for_day
 )
-from mistral_llm import call_mistral, extract_first_json
-from prompt import SYSTEM_PROMPT
-from voice_utils import transcribe, speak
+from date_resolver import resolve_action_dates, today_ist
+from intent_parser import parse_intent, stats as intent_stats
+from listing import render_listing
+from mistral_llm import get_action
+from pipeline import TurnPipeline
+from prompt import PROMPT_VARIANTS
+from summarizer import RollingSummarizer
+from telemetry import telemetry
+from token_budget import HISTORY_TOKEN_BUDGET, measure, snapshot, trim_history
 
 def parse_datetime_safe(dt_str):
     try:
@@ -274,164 +281,229 @@ def parse_datetime_safe(dt_str):
             return datetime.datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
         raise
 
-def summarize_conversation(conv_text, previous_summary=""):
-    """
-    Ask the LLM to produce a concise summary of the conversation so far.
-    This helps keep context bounded and clean.
+# Cumulative LLM token use and fast-path hits, in every turn record and on /metrics
+telemetry.register_counters(lambda: {f"llm_{name}": value for name, value in snapshot().items()})
+telemetry.register_counters(lambda: {f"intent_{name}": value for name, value in intent_stats.items()})
+
+PROMPT_VARIANT = "full"  # or "compact" for the shorter, machine-oriented system prompt
+
+INTRO = "Hello! I'm here to help with anything—scheduling or chat. How can I assist you today?"
+# Fixed replies, synthesized into the TTS cache at startup so they play instantly
+KNOWN_PHRASES = [
+    INTRO,
+    "Sorry, I didn't get that.",
+    "No free slots available.",
+    "No free slots found.",
+    "No events found.",
+    "Specify what to delete",
+    "Specify the dates to delete",
+    "Okay! What next?",
+    "Something went wrong. Let's try again.",
+    "How long should the meeting be?",
+]
+
+def main(listen=None, speak=None, llm_action=get_action, summarizer=None, today=None):
+    """Run the conversation loop.
+
+    By default this talks through the microphone and ElevenLabs; headless.py
+    passes text I/O, a stub `llm_action` and a fixed `today` instead. The loop
+    ends when `listen()` returns None.
     """
-    prompt = f"Previous summary:\n{previous_summary}\n\nConversation so far:\n{conv_text}\n\nProvide a concise summary:"
-    summary_response = call_mistral([{"role":"system","content":"Summarize the conversation."},
-                                     {"role":"user","content":prompt}])
-    # The summarized text is assumed to be optionally in plain text or JSON field
-    return summary_response.strip()
+    voice = speak is None
+    if voice:
+        from voice_utils import speak, warm_tts_cache
+    if listen is None:
+        from voice_utils import transcribe as listen
 
-def main():
     memory = {"title": None, "date": None, "time": None, "duration": None}
-    raw_conversation = ""
-    summary = ""
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-    # Initial greeting
-    intro = "Hello! I'm here to help with anything—scheduling or chat. How can I assist you today?"
-    speak(intro)
-    print(intro)
+    summarizer = summarizer or RollingSummarizer()
+    messages = [{"role": "system", "content": PROMPT_VARIANTS[PROMPT_VARIANT]}]
+    pipeline = TurnPipeline(speak)
+    say = pipeline.say
+    telemetry.serve()
+
+    # Initial greeting; the calendar and TTS cache warm up while it plays
+    say(INTRO)
+    print(INTRO)
+    pipeline.prefetch(event_store.sync)
+    if voice:
+        pipeline.prefetch(warm_tts_cache, KNOWN_PHRASES)
 
     while True:
-        user_input = transcribe()
+        # Finish speaking before listening, so the mic doesn't hear us
+        pipeline.drain()
+        telemetry.end_turn()
+        user_input = listen()
+        if user_input is None:
+            break
         if not user_input:
             continue
         print("User:", user_input)
+        telemetry.begin_turn(chars=len(user_input))
 
-        # Update conversation log
-        raw_conversation += f"User: {user_input}\n"
-        summary = summarize_conversation(raw_conversation, summary)
+        # Refresh calendar state while the LLM works on the action
+        pipeline.prefetch(event_store.sync)
+
+        # Use the latest finished summary; this turn is folded in the background
+        summary = summarizer.latest()
+        summarizer.add_turn("User", user_input)
 
         # Build enhanced prompt
         prompt = f"{summary}\nUser: {user_input}"
         messages.append({"role": "user", "content": prompt})
-        if len(messages) > 12:
-            messages = messages[:1] + messages[-10:]
+        messages = trim_history(messages, HISTORY_TOKEN_BUDGET)
 
         try:
-            llm_output = call_mistral(messages)
-            parsed = extract_first_json(llm_output)
+            # Common commands are parsed locally; the rest go to the (cached, streamed) LLM
+            with telemetry.span("intent"):
+                parsed = parse_intent(user_input, today)
+            if parsed:
+                llm_output = json.dumps(parsed)
+            else:
+                print("Prompt tokens:", measure(messages, summary))
+                with telemetry.span("llm"):
+                    parsed, llm_output = llm_action(messages, user_input, memory, today=today)
             print("LLM response:", llm_output)
 
+            # Turn date phrases ("next monday", "a day after Team Sync") into IST dates
+            if parsed:
+                if "after_event" in parsed and not parsed.get("start_date"):
+                    parsed["start_date"] = f"{parsed.get('offset_days', 1)} days after {parsed['after_event']}"
+                with telemetry.span("resolve_dates"):
+                    parsed = resolve_action_dates(parsed, today, find_event=get_event_time_by_title)
+
             # Update memory if applicable
             if parsed:
                 if "title" in parsed: memory["title"] = parsed["title"]
-                if "date" in parsed and parsed["date"] != "last_weekday_of_month":
-                    memory["date"] = parsed["date"]
+                if "date" in parsed: memory["date"] = parsed["date"]
                 if "start_time" in parsed or "time_pref" in parsed:
                     memory["time"] = parsed.get("start_time") or parsed.get("time_pref")
                 if "duration" in parsed: memory["duration"] = parsed["duration"]
 
             # Handle actions
             if not parsed:
-                speak("Sorry, I didn't get that.")
+                say("Sorry, I didn't get that.")
                 continue
 
-            # Scheduling logic
-            if parsed["action"] == "schedule":
-                if not all([memory["title"], memory["date"], memory["time"], memory["duration"]]):
-                    missing = [k for k in memory if not memory[k]]
-                    speak(f"Please provide the {', '.join(missing)}.")
+            # Time the action itself (calendar reads and writes; speech is queued)
+            telemetry.annotate(action=parsed["action"])
+            with telemetry.span(f"action.{parsed['action']}"):
+                # Scheduling logic
+                if parsed["action"] == "schedule":
+                    if not all([memory["title"], memory["date"], memory["time"], memory["duration"]]):
+                        missing = [k for k in memory if not memory[k]]
+                        say(f"Please provide the {', '.join(missing)}.")
+                        continue
+
+                    start = memory["time"]
+                    if "T" not in start: start = f"{memory['date']}T{start}:00"
+                    dt = parse_datetime_safe(start)
+                    if is_conflict(dt, memory["duration"]):
+                        alt = suggest_alternative(dt, memory["duration"])
+                        if alt:
+                            say(f"Slot is busy. How about {alt.strftime('%H:%M')} instead?")
+                            continue
+                        else:
+                            say("No free slots available.")
+                            continue
+
+                    ev = create_event(memory["title"], start, memory["duration"])
+                    say(f"Scheduled: {ev['summary']} at {ev['start']['dateTime']}")
+                    memory = {"title": None, "date": None, "time": None, "duration": None}
                     continue
 
-                start = memory["time"]
-                if "T" not in start: start = f"{memory['date']}T{start}:00"
-                dt = parse_datetime_safe(start)
-                if is_conflict(dt, memory["duration"]):
-                    alt = suggest_alternative(dt, memory["duration"])
-                    if alt:
-                        speak(f"Slot is busy. How about {alt.strftime('%H:%M')} instead?")
+                # Find-time action
+                if parsed["action"] == "find_time":
+                    try:
+                        dur = int(parsed.get("duration") or 0)
+                    except (TypeError, ValueError):
+                        dur = 0
+                    if dur <= 0:
+                        say("How long should the meeting be?")
                         continue
+                    pref = parsed.get("time_pref", "any")
+                    day = parsed.get("day") or parsed.get("start_date")
+                    if not day:
+                        day = ((today or today_ist()) + datetime.timedelta(days=1)).isoformat()
+                    slots = find_free_slots_for_day(
+                        datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time()), dur, pref
+                    )
+                    if not slots:
+                        say("No free slots found.")
+                        continue
+                    times = ", ".join(s.strftime("%H:%M") for s in slots)
+                    say(f"Available: {times}. Which would you like?")
+                    continue
+
+                # Listing
+                if parsed["action"] == "list":
+                    year = int(parsed.get("year", (today or today_ist()).year))
+
+                    # Prevent unsupported future dates
+                    if year > 2025:
+                        say(f"Sorry, I can only manage events up to 2025.")
+                        continue
+
+                    if "date" in parsed:
+                        events = get_events_by_date(parsed["date"])
+                        empty_msg = "No events found."
+                    elif "month" in parsed:
+                        month = int(parsed["month"])
+                        events = iter_events_for_month(year, month)
+                        empty_msg = "No events found."
                     else:
-                        speak("No free slots available.")
+                        # If only year is given, stream the whole year from one query
+                        events = iter_events_for_year(year)
+                        empty_msg = f"No events found in {year}."
+
+                    # Print every event; speak a few day-grouped utterances
+                    lines, utterances = render_listing(events)
+                    for line in lines:
+                        print(line)
+                    for utterance in utterances or [empty_msg]:
+                        say(utterance)
+                    if "date" not in parsed and "month" not in parsed:
                         continue
 
-                ev = create_event(memory["title"], start, memory["duration"])
-                speak(f"Scheduled: {ev['summary']} at {ev['start']['dateTime']}")
-                memory = {"title": None, "date": None, "time": None, "duration": None}
-                continue
 
-            # Find-time action
-            if parsed["action"] == "find_time":
-                dur = parsed["duration"]
-                pref = parsed.get("time_pref", "any")
-                day = parsed.get("day")
-                if not day:
-                    day = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-                slots = find_free_slots_for_day(
-                    datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time()), dur, pref
-                )
-                if not slots:
-                    speak("No free slots found.")
+                # Deleting
+                if parsed["action"] == "delete":
+                    title = parsed.get("title") or memory.get("title")
+                    date = parsed.get("date") or memory.get("date")
+                    if not title or not date:
+                        say("Specify what to delete")
+                        continue
+                    res = delete_event_by_exact_match(title, date)
+                    say(res)
                     continue
-                times = ", ".join(s.strftime("%H:%M") for s in slots)
-                speak(f"Available: {times}. Which would you like?")
-                continue
 
-            # Listing
-            if parsed["action"] == "list":
-                now = datetime.datetime.now()
-                year = int(parsed.get("year", now.year))
-            
-                # Prevent unsupported future dates
-                if year > 2025:
-                    speak(f"Sorry, I can only manage events up to 2025.")
-                    continue
-            
-                if "date" in parsed:
-                    events = get_events_by_date(parsed["date"])
-                elif "month" in parsed:
-                    month = int(parsed["month"])
-                    events = list_events_for_month(year, month)
-                else:
-                    # If only year is given, list each month and collect events
-                    all_events = []
-                    for m in range(1, 13):
-                        month_events = list_events_for_month(year, m)
-                        all_events.extend(month_events)
-                    if not all_events:
-                        speak(f"No events found in {year}.")
+                # Bulk deleting over a date range
+                if parsed["action"] == "delete_range":
+                    start_date = parsed.get("start_date")
+                    end_date = parsed.get("end_date") or start_date
+                    if not start_date:
+                        say("Specify the dates to delete")
                         continue
-                    for e in all_events:
-                        speak(f"{e['summary']} at {e['start'].get('dateTime')}")
+                    res = delete_events_in_range(start_date, end_date, parsed.get("title"))
+                    print(res)
+                    say(res)
                     continue
-            
-                # If events exist
-                if events:
-                    for e in events:
-                        speak(f"{e['summary']} at {e['start'].get('dateTime')}")
-                else:
-                    speak("No events found.")
 
-
-            # Deleting
-            if parsed["action"] == "delete":
-                title = parsed.get("title") or memory.get("title")
-                date = parsed.get("date") or memory.get("date")
-                if not title or not date:
-                    speak("Specify what to delete")
+                # Ask fallback
+                if parsed["action"] == "ask":
+                    say(parsed["question"])
                     continue
-                res = delete_event_by_exact_match(title, date)
-                speak(res)
-                continue
 
-            # Ask fallback
-            if parsed["action"] == "ask":
-                speak(parsed["question"])
-                continue
-
-            # Fallback for everything else
-            speak("Okay! What next?")
-            raw_conversation += f"Assistant: Okay! What next?\n"
-            summary = summarize_conversation(raw_conversation, summary)
+                # Fallback for everything else
+                say("Okay! What next?")
+                summarizer.add_turn("Assistant", "Okay! What next?")
 
         except Exception as e:
             print("Error:", e)
-            speak("Something went wrong. Let's try again.")
+            say("Something went wrong. Let's try again.")
+
+    pipeline.close()
+    telemetry.end_turn()
 
 
 if __name__ == "__main__":
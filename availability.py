@@ -0,0 +1,58 @@
+# availability.py
+import datetime
+import numpy as np
+
+MINUTE = datetime.timedelta(minutes=1)
+MINUTES_PER_DAY = 24 * 60
+
+
+class AvailabilityGrid:
+    """Per-minute busy/free raster of a time window, searched with vectorized ops."""
+
+    def __init__(self, intervals, window_start, window_end):
+        """`intervals` are (start, end) aware datetimes; `window_start` sets the clock used for hours."""
+        self.window_start = window_start
+        self.size = int((window_end - window_start) // MINUTE)
+
+        bounds = [
+            ((start - window_start) // MINUTE, -((window_start - end) // MINUTE))
+            for start, end in intervals
+        ]
+        diff = np.zeros(self.size + 1, dtype=np.int32)
+        if bounds:
+            starts, ends = np.clip(np.array(bounds, dtype=np.int64), 0, self.size).T
+            np.add.at(diff, starts, 1)
+            np.add.at(diff, ends, -1)
+        self.busy = np.cumsum(diff[:-1]) > 0
+
+        # busy minutes before each index, so any window's busy count is a subtraction
+        self.prefix = np.concatenate(([0], np.cumsum(self.busy, dtype=np.int64)))
+        first_minute = window_start.hour * 60 + window_start.minute
+        self.minute_of_day = (first_minute + np.arange(self.size)) % MINUTES_PER_DAY
+
+    def free_mask(self, duration_minutes):
+        """Boolean array: True at every minute where a `duration_minutes` meeting fits."""
+        if duration_minutes < 1:
+            raise ValueError(f"duration must be at least one minute, got {duration_minutes!r}")
+        mask = np.zeros(self.size, dtype=bool)
+        last = self.size - duration_minutes + 1
+        if last > 0:
+            mask[:last] = self.prefix[duration_minutes:] - self.prefix[:last] == 0
+        return mask
+
+    def free_starts(self, duration_minutes, granularity=1, hours=None, before=None, limit=None):
+        """Feasible start datetimes, aligned to `granularity` minutes past the hour.
+
+        `hours` is an optional (first_hour, end_hour) range for start times, and
+        `before` an optional cut-off datetime for starts.
+        """
+        mask = self.free_mask(duration_minutes)
+        mask &= self.minute_of_day % granularity == 0
+        if hours is not None:
+            mask &= (self.minute_of_day >= hours[0] * 60) & (self.minute_of_day < hours[1] * 60)
+        if before is not None:
+            mask[max(0, int((before - self.window_start) // MINUTE)):] = False
+        offsets = np.flatnonzero(mask)
+        if limit is not None:
+            offsets = offsets[:limit]
+        return [self.window_start + int(i) * MINUTE for i in offsets]
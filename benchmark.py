@@ -0,0 +1,221 @@
+# benchmark.py
+# Runs every calendar_utils entry point and the app.main action branches
+# against a FakeCalendarService filled with synthetic events, and reports
+# API round-trips, response bytes, wall time and peak allocations per case.
+#
+#   python benchmark.py                        # compare with benchmark_baseline.json
+#   python benchmark.py --sizes 10,1000 --latency 50
+#   python benchmark.py --update               # store these results as the baseline
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import app
+from calendar_utils import (
+    IST, event_store, set_calendar_service, set_clock, get_events_by_date, list_events_for_month,
+    iter_events_for_year, create_event, create_events, delete_event_by_exact_match,
+    delete_events_in_range, is_conflict, suggest_alternative, find_next_free_slots,
+    find_free_slots_for_day, get_last_meeting_time, get_usual_event_template,
+    get_event_time_by_title
+)
+from fake_calendar import FakeCalendarService
+from headless import TextSession
+from summarizer import RollingSummarizer
+from telemetry import telemetry
+
+SIZES = (10, 1000, 10000, 100000)
+BASELINE_FILE = "benchmark_baseline.json"
+SEED = 42
+# Pinned "today" (and calendar clock, at noon IST), so runs are comparable across days and
+# the app's listing branches run instead of hitting their "events up to 2025" refusal
+BENCH_TODAY = datetime.date(2025, 6, 18)
+HISTORY_DAYS = 730  # synthetic events start this far back, past the event store's lookback
+FUTURE_DAYS = 60
+TITLES = ["Team Sync", "Design Review", "1:1 with Priya", "Standup", "Customer Call", "Lunch"]
+
+# A case regresses when it needs more round-trips, or exceeds its baseline by these margins
+BYTES_TOLERANCE = 1.10
+TIME_TOLERANCE = 1.5
+TIME_SLACK_MS = 5.0  # absolute allowance so tiny cases don't flap
+ALLOC_TOLERANCE = 1.25
+ALLOC_SLACK_KB = 16.0  # absolute allowance; traces also catch the app's background threads
+
+
+def synthetic_calendar(n, today, latency=0.0):
+    """A fake calendar with `n` reproducible events spread around `today`, 08:00-20:00 IST."""
+    rng = random.Random(SEED)
+    service = FakeCalendarService(latency=latency)
+    first_day = today - datetime.timedelta(days=HISTORY_DAYS)
+    for _ in range(n):
+        day = first_day + datetime.timedelta(days=rng.randrange(HISTORY_DAYS + FUTURE_DAYS))
+        start = IST.localize(datetime.datetime.combine(day, datetime.time(rng.randrange(8, 20), rng.choice((0, 30)))))
+        service.add_event(rng.choice(TITLES), start, start + datetime.timedelta(minutes=rng.choice((30, 60, 90))))
+    return service
+
+
+def app_turn(action, today):
+    """One app.main turn on `today` whose (stubbed) LLM answers with `action`."""
+    def run():
+        session = TextSession(["benchmark turn"])
+        app.main(
+            listen=session.listen,
+            speak=session.speak,
+            llm_action=lambda messages, utterance, memory, today=None: (dict(action), json.dumps(action)),
+            summarizer=RollingSummarizer(summarize=lambda new_turns, previous: previous),
+            today=today,
+        )
+    return run
+
+
+def cases(service, today):
+    """(name, fn) pairs run in order on one calendar: reads first, then mutations."""
+    day = lambda offset: today + datetime.timedelta(days=offset)
+    slot = datetime.datetime.combine(day(1), datetime.time(10, 0))
+
+    def incremental_sync():
+        for i in range(10):
+            start = IST.localize(datetime.datetime.combine(day(3), datetime.time(8 + i)))
+            service.add_event("Added elsewhere", start, start + datetime.timedelta(minutes=30))
+        event_store.sync(force=True)
+
+    return [
+        ("get_events_by_date", lambda: get_events_by_date(day(1).isoformat())),
+        ("list_events_for_month", lambda: list_events_for_month(today.year, today.month)),
+        ("iter_events_for_year", lambda: list(iter_events_for_year(today.year))),
+        ("iter_events_for_year.uncached", lambda: list(iter_events_for_year(today.year - 1))),
+        ("is_conflict", lambda: is_conflict(slot, 30)),
+        ("suggest_alternative", lambda: suggest_alternative(slot, 30)),
+        ("find_next_free_slots", lambda: find_next_free_slots(30)),
+        ("find_free_slots_for_day", lambda: find_free_slots_for_day(slot.replace(hour=0), 60)),
+        ("get_last_meeting_time", get_last_meeting_time),
+        ("get_usual_event_template", lambda: get_usual_event_template("sync")),
+        ("get_event_time_by_title", lambda: get_event_time_by_title("review")),
+        ("app.list_day", app_turn({"action": "list", "date": day(1).isoformat()}, today)),
+        ("app.list_month", app_turn({"action": "list", "year": today.year, "month": today.month}, today)),
+        ("app.list_year", app_turn({"action": "list", "year": today.year}, today)),
+        ("app.find_time", app_turn({"action": "find_time", "duration": 30, "day": day(1).isoformat()}, today)),
+        ("create_event", lambda: create_event("Benchmark", f"{day(1)}T07:00:00", 30)),
+        ("create_events", lambda: create_events(
+            [("Benchmark", f"{day(i)}T07:30:00", 30) for i in range(1, 21)])),
+        ("delete_event_by_exact_match", lambda: delete_event_by_exact_match("Team Sync", day(1).isoformat())),
+        ("delete_events_in_range", lambda: delete_events_in_range(day(7).isoformat(), day(13).isoformat())),
+        ("app.schedule", app_turn({"action": "schedule", "title": "Benchmark", "date": day(2).isoformat(),
+                                   "start_time": "07:00", "duration": 30}, today)),
+        ("app.delete", app_turn({"action": "delete", "title": "Standup", "date": day(2).isoformat()}, today)),
+        ("app.delete_range", app_turn({"action": "delete_range", "start_date": day(14).isoformat(),
+                                       "end_date": day(20).isoformat()}, today)),
+        ("sync.incremental", incremental_sync),
+    ]
+
+
+def _measure(service, fn, trace):
+    service.reset_counters()
+    if trace:
+        tracemalloc.start()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    result = {"round_trips": service.round_trips, "requests": dict(service.calls), "bytes": service.bytes}
+    if trace:
+        result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    else:
+        result["ms"] = round(elapsed * 1000, 2)
+    return result
+
+
+def _run_pass(size, today, latency, trace):
+    now = IST.localize(datetime.datetime.combine(today, datetime.time(12)))
+    set_clock(lambda: now)
+    service = synthetic_calendar(size, today, latency)
+    set_calendar_service(service)
+    results = {"sync.full": _measure(service, lambda: event_store.sync(force=True), trace)}
+    # Keep the store from re-syncing mid-run, so every case sees the same warm state
+    min_interval, event_store.min_interval = event_store.min_interval, float("inf")
+    try:
+        for name, fn in cases(service, today):
+            results[name] = _measure(service, fn, trace)
+    finally:
+        event_store.min_interval = min_interval
+        set_clock(None)
+    return results
+
+
+def run(size, today, latency=0.0):
+    """Results per case for one calendar size: timed without tracing, then re-run traced for allocations."""
+    results = _run_pass(size, today, latency, trace=False)
+    for name, traced in _run_pass(size, today, latency, trace=True).items():
+        results[name]["peak_kb"] = traced["peak_kb"]
+    return results
+
+
+def regressions(results, baseline):
+    """Human-readable regressions of `results` against `baseline` (both keyed by size, then case)."""
+    found = []
+    for size, by_case in results.items():
+        for name, now in by_case.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            label = f"{size} events / {name}"
+            if now["round_trips"] > before["round_trips"]:
+                found.append(f"{label}: {before['round_trips']} -> {now['round_trips']} round-trips")
+            if now["bytes"] > before["bytes"] * BYTES_TOLERANCE:
+                found.append(f"{label}: {before['bytes']} -> {now['bytes']} bytes")
+            if now["ms"] > before["ms"] * TIME_TOLERANCE + TIME_SLACK_MS:
+                found.append(f"{label}: {before['ms']} -> {now['ms']} ms")
+            if now["peak_kb"] > before["peak_kb"] * ALLOC_TOLERANCE + ALLOC_SLACK_KB:
+                found.append(f"{label}: {before['peak_kb']} -> {now['peak_kb']} KB peak")
+    return found
+
+
+def _print_table(size, by_case):
+    print(f"\n📅 {size} events")
+    print(f"{'case':32} {'trips':>6} {'KB':>10} {'ms':>10} {'peak KB':>10}")
+    for name, r in by_case.items():
+        print(f"{name:32} {r['round_trips']:>6} {r['bytes'] / 1024:>10.1f} {r['ms']:>10.2f} {r['peak_kb']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark calendar access per action against a fake calendar.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated calendar sizes (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected latency per round-trip, in ms")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file (default: %(default)s)")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    telemetry.path = None  # benchmark turns shouldn't land in the production timings file
+    today = BENCH_TODAY
+    results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        results[str(size)] = run(size, today, args.latency / 1000)
+        _print_table(size, results[str(size)])
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}; run with --update to create one.")
+        return 0
+    found = regressions(results, baseline)
+    for line in found:
+        print("❌ Regression:", line)
+    print(f"\n{'❌' if found else '✅'} {len(found)} regressions against {args.baseline}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,79 @@
+import bisect
 import datetime
+import os
+import threading
+import time
 import pytz
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 from dateutil import parser  # Add at top if not imported
+from availability import AvailabilityGrid
+from telemetry import telemetry
 # Config
 GOOGLE_CREDS_FILE = "credentials.json"
+DISCOVERY_CACHE_FILE = "calendar_v3_discovery.json"  # optional on-disk discovery document
 TIMEZONE = "Asia/Kolkata"
+SYNC_LOOKBACK_DAYS = 400  # how far back the local event store mirrors the calendar
+SYNC_MIN_INTERVAL = 5  # seconds between incremental syncs; reads in between are purely local
+EVENT_FIELDS = "id,status,summary,start,end"  # the only event fields any caller reads
+PAGE_FIELDS = f"nextPageToken,nextSyncToken,items({EVENT_FIELDS})"
+BATCH_SIZE = 50  # max calls per batch request the Calendar API accepts
 
 # Timezones
 IST = pytz.timezone(TIMEZONE)
 UTC = pytz.utc
 
-# Google Calendar setup
+# Google Calendar setup (built lazily on first use)
 SCOPES = ['https://www.googleapis.com/auth/calendar']
-credentials = service_account.Credentials.from_service_account_file(GOOGLE_CREDS_FILE, scopes=SCOPES)
-calendar_service = build('calendar', 'v3', credentials=credentials)
+_calendar_service = None
+_calendar_service_lock = threading.Lock()
+
+def _load_discovery_document():
+    """Calendar v3 discovery document from DISCOVERY_CACHE_FILE, else the copy bundled with googleapiclient."""
+    if os.path.exists(DISCOVERY_CACHE_FILE):
+        with open(DISCOVERY_CACHE_FILE, encoding="utf-8") as f:
+            return f.read()
+    return get_static_doc('calendar', 'v3')
+
+def get_calendar_service():
+    """Return the shared Calendar service, building it on first call without any network fetch."""
+    global _calendar_service
+    if _calendar_service is None:
+        with _calendar_service_lock:
+            if _calendar_service is None:
+                credentials = service_account.Credentials.from_service_account_file(GOOGLE_CREDS_FILE, scopes=SCOPES)
+                document = _load_discovery_document()
+                if document:
+                    _calendar_service = build_from_document(document, credentials=credentials)
+                else:
+                    _calendar_service = build('calendar', 'v3', credentials=credentials)
+    return _calendar_service
+
+_clock = None
+
+def now_utc():
+    """Current time as an aware UTC datetime, from the clock set by `set_clock` if any."""
+    return _clock() if _clock is not None else datetime.datetime.now(UTC)
+
+def set_clock(clock=None):
+    """Pin "now" for every calendar helper to `clock()` (e.g. for replays); None restores the wall clock."""
+    global _clock
+    _clock = clock
+
+def set_calendar_service(service):
+    """Use `service` for all calendar calls (e.g. a stand-in for tests) and reset the local store."""
+    global _calendar_service
+    with _calendar_service_lock:
+        _calendar_service = service
+    event_store.reset()
+
+def __getattr__(name):
+    # Keep `calendar_utils.calendar_service` working without building it at import time
+    if name == "calendar_service":
+        return get_calendar_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Helpers
 def ist_to_utc(dt):
@@ -28,17 +87,156 @@ def utc_to_ist(utc_str):
     dt = datetime.datetime.fromisoformat(utc_str.replace("Z", "+00:00"))
     return dt.astimezone(IST)
 
+def _event_bounds_utc(event):
+    """Return (start, end) of an event as UTC datetimes; all-day events use IST midnights."""
+    bounds = []
+    for key in ("start", "end"):
+        value = event[key].get("dateTime")
+        if value:
+            bounds.append(datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(UTC))
+        else:
+            day = datetime.datetime.fromisoformat(event[key]["date"])
+            bounds.append(IST.localize(day).astimezone(UTC))
+    return tuple(bounds)
+
+
+def _iter_pages(**params):
+    """Yield raw events().list pages for `params`, following nextPageToken."""
+    page_token = None
+    while True:
+        request = get_calendar_service().events().list(
+            calendarId='primary',
+            singleEvents=True,
+            fields=PAGE_FIELDS,
+            pageToken=page_token,
+            **params
+        )
+        with telemetry.span("calendar.list"):
+            result = request.execute()
+        yield result
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return
+
+
+class EventStore:
+    """Local mirror of the primary calendar, kept current with incremental syncToken syncs."""
+
+    def __init__(self, lookback_days=SYNC_LOOKBACK_DAYS, min_interval=SYNC_MIN_INTERVAL):
+        self.lookback_days = lookback_days
+        self.min_interval = min_interval
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Forget all mirrored state; the next read does a full sync."""
+        with self.lock:
+            self.events = {}
+            self.bounds = {}  # event id -> (start_utc, end_utc)
+            self.order = []  # sorted (start_utc, event id)
+            self.max_span = datetime.timedelta(0)
+            self.sync_token = None
+            self.window_start = None
+            self.last_sync = None
+
+    def _drop(self, event_id):
+        self.events.pop(event_id, None)
+        bounds = self.bounds.pop(event_id, None)
+        if bounds is not None:
+            i = bisect.bisect_left(self.order, (bounds[0], event_id))
+            del self.order[i]
+
+    def _apply(self, event):
+        self._drop(event["id"])
+        if event.get("status") == "cancelled":
+            return
+        start, end = _event_bounds_utc(event)
+        self.events[event["id"]] = event
+        self.bounds[event["id"]] = (start, end)
+        bisect.insort(self.order, (start, event["id"]))
+        self.max_span = max(self.max_span, end - start)
+
+    def _fetch(self, **params):
+        """Apply every item of a paginated fetch; returns the next sync token."""
+        sync_token = None
+        for page in _iter_pages(**params):
+            for event in page.get('items', []):
+                self._apply(event)
+            sync_token = page.get('nextSyncToken')
+        return sync_token
+
+    def _full_sync(self):
+        self.events, self.bounds, self.order = {}, {}, []
+        self.max_span = datetime.timedelta(0)
+        window_start = now_utc() - datetime.timedelta(days=self.lookback_days)
+        self.sync_token = self._fetch(timeMin=window_start.isoformat())
+        self.window_start = window_start
+
+    def sync(self, force=False):
+        """Pull changes since the last sync; the first call (or an expired token) does a full sync."""
+        with self.lock:
+            if (not force and self.last_sync is not None
+                    and time.monotonic() - self.last_sync < self.min_interval):
+                return
+            with telemetry.span("calendar.sync"):
+                if self.sync_token is None:
+                    self._full_sync()
+                else:
+                    try:
+                        self.sync_token = self._fetch(syncToken=self.sync_token)
+                    except HttpError as e:
+                        if e.resp.status != 410:
+                            raise
+                        print("🔄 Sync token expired, doing a full calendar sync.")
+                        self._full_sync()
+            self.last_sync = time.monotonic()
+
+    def covers(self, start_time):
+        """True if the store mirrors everything from `start_time` (UTC) onwards."""
+        return self.window_start is not None and start_time >= self.window_start
+
+    def iter_between(self, start_time, end_time):
+        """Yield events overlapping [start_time, end_time), ordered by start time."""
+        with self.lock:
+            lo = bisect.bisect_left(self.order, (start_time - self.max_span,))
+            hi = bisect.bisect_left(self.order, (end_time,))
+            candidates = [(self.bounds[i][1], self.events[i]) for _, i in self.order[lo:hi]]
+        for end, event in candidates:
+            if end > start_time:
+                yield event
+
+    def events_between(self, start_time, end_time):
+        """Events overlapping [start_time, end_time), ordered by start time."""
+        return list(self.iter_between(start_time, end_time))
+
+    def put(self, event):
+        with self.lock:
+            self._apply(event)
+
+    def remove(self, event_id):
+        with self.lock:
+            self._drop(event_id)
+
+
+event_store = EventStore()
+
 # Event Functions
+def iter_events(start_time, end_time):
+    """Lazily yield events between two UTC datetimes, ordered by start time.
+
+    Served from the local event store when it covers the range, otherwise
+    streamed page by page from the API with only EVENT_FIELDS requested.
+    """
+    event_store.sync()
+    if event_store.covers(start_time):
+        yield from event_store.iter_between(start_time, end_time)
+        return
+    for page in _iter_pages(timeMin=start_time.isoformat(), timeMax=end_time.isoformat(), orderBy='startTime'):
+        yield from page.get('items', [])
+
 def list_events(start_time, end_time):
     """List events between two UTC datetimes."""
-    events_result = calendar_service.events().list(
-        calendarId='primary',
-        timeMin=start_time.isoformat(),
-        timeMax=end_time.isoformat(),
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
-    return events_result.get('items', [])
+    return list(iter_events(start_time, end_time))
 
 def get_events_by_date(date_str):
     """List events for a given date string (YYYY-MM-DD) in IST."""
@@ -49,38 +247,142 @@ def get_events_by_date(date_str):
     end_utc = end.astimezone(UTC)
     return list_events(start_utc, end_utc)
 
-def list_events_for_month(year, month):
-    """List events for the given month in IST."""
+def iter_events_for_month(year, month):
+    """Lazily yield events for the given month in IST."""
     start = IST.localize(datetime.datetime(year, month, 1))
     if month == 12:
         end = IST.localize(datetime.datetime(year + 1, 1, 1))
     else:
         end = IST.localize(datetime.datetime(year, month + 1, 1))
-    return list_events(start.astimezone(UTC), end.astimezone(UTC))
+    return iter_events(start.astimezone(UTC), end.astimezone(UTC))
 
-def create_event(title, start_time_iso, duration_minutes):
-    """Create event with start_time in IST ISO format."""
+def iter_events_for_range(start_date, end_date):
+    """Lazily yield events between two IST dates (inclusive) with a single query."""
+    start = IST.localize(datetime.datetime.combine(start_date, datetime.time()))
+    end = IST.localize(datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time()))
+    return iter_events(start.astimezone(UTC), end.astimezone(UTC))
+
+def iter_events_for_year(year):
+    """Lazily yield every event in the given IST year with a single query."""
+    return iter_events_for_range(datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+
+def list_events_for_month(year, month):
+    """List events for the given month in IST."""
+    return list(iter_events_for_month(year, month))
+
+def _event_body(title, start_time_iso, duration_minutes):
+    """Build an insert body for an event starting at an IST ISO time."""
     start_ist = datetime.datetime.fromisoformat(start_time_iso)
     start_utc = ist_to_utc(start_ist)
     end_utc = start_utc + datetime.timedelta(minutes=duration_minutes)
-    event = {
+    return {
         'summary': title,
         'start': {'dateTime': start_utc.isoformat(), 'timeZone': 'UTC'},
         'end': {'dateTime': end_utc.isoformat(), 'timeZone': 'UTC'}
     }
-    return calendar_service.events().insert(calendarId='primary', body=event).execute()
 
-def is_conflict(start_ist, duration_minutes):
-    """Check for any conflict for the given IST datetime."""
+def create_event(title, start_time_iso, duration_minutes):
+    """Create event with start_time in IST ISO format."""
+    event = _event_body(title, start_time_iso, duration_minutes)
+    request = get_calendar_service().events().insert(calendarId='primary', body=event)
+    with telemetry.span("calendar.insert"):
+        created = request.execute()
+    event_store.put(created)
+    return created
+
+def _mutation_request(op):
+    events = get_calendar_service().events()
+    if op["op"] == "insert":
+        return events.insert(calendarId='primary', body=op["body"])
+    if op["op"] == "delete":
+        return events.delete(calendarId='primary', eventId=op["event_id"])
+    if op["op"] == "patch":
+        return events.patch(calendarId='primary', eventId=op["event_id"], body=op["body"])
+    raise ValueError(f"Unknown mutation: {op['op']}")
+
+def batch_mutate(operations):
+    """Run event mutations as Google API batch requests, BATCH_SIZE per round-trip.
+
+    Each operation is {"op": "insert", "body": {...}}, {"op": "delete", "event_id": ...}
+    or {"op": "patch", "event_id": ..., "body": {...}}. Returns one
+    {"ok": bool, "response": ..., "error": ...} dict per operation, in order.
+    """
+    operations = list(operations)
+    results = [None] * len(operations)
+
+    def on_result(request_id, response, exception):
+        i = int(request_id)
+        op = operations[i]
+        if exception is not None:
+            results[i] = {"ok": False, "response": None, "error": str(exception)}
+            return
+        if op["op"] == "delete":
+            event_store.remove(op["event_id"])
+        else:
+            event_store.put(response)
+        results[i] = {"ok": True, "response": response, "error": None}
+
+    for offset in range(0, len(operations), BATCH_SIZE):
+        batch = get_calendar_service().new_batch_http_request(callback=on_result)
+        for i in range(offset, min(offset + BATCH_SIZE, len(operations))):
+            batch.add(_mutation_request(operations[i]), request_id=str(i))
+        with telemetry.span("calendar.batch"):
+            batch.execute()
+    return results
+
+def create_events(specs):
+    """Create many events in batches; `specs` are (title, start_time_iso, duration_minutes) tuples."""
+    return batch_mutate({"op": "insert", "body": _event_body(*spec)} for spec in specs)
+
+def delete_events(events):
+    """Delete many events in batches; returns per-event results."""
+    return batch_mutate({"op": "delete", "event_id": e["id"]} for e in events)
+
+class BusyIndex:
+    """Sorted, merged busy intervals answering overlap queries without API calls."""
+
+    def __init__(self, events):
+        intervals = sorted(_event_bounds_utc(e) for e in events)
+        self.starts = []
+        self.ends = []
+        for start, end in intervals:
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def for_window(cls, start_utc, end_utc):
+        """Build an index from one fetch covering [start_utc, end_utc)."""
+        return cls(list_events(start_utc, end_utc))
+
+    def overlaps(self, start_utc, end_utc):
+        """True if any busy interval intersects [start_utc, end_utc)."""
+        i = bisect.bisect_left(self.starts, end_utc) - 1
+        return i >= 0 and self.ends[i] > start_utc
+
+
+def is_conflict(start_ist, duration_minutes, busy=None):
+    """Check for any conflict for the given IST datetime.
+
+    Pass a prebuilt `busy` index to answer locally; otherwise one fetch is made.
+    """
     start_utc = ist_to_utc(start_ist)
     end_utc = start_utc + datetime.timedelta(minutes=duration_minutes)
-    return len(list_events(start_utc, end_utc)) > 0
+    if busy is None:
+        busy = BusyIndex.for_window(start_utc, end_utc)
+    return busy.overlaps(start_utc, end_utc)
 
-def suggest_alternative(start_ist, duration_minutes, max_tries=6):
+def suggest_alternative(start_ist, duration_minutes, max_tries=6, busy=None):
     """Suggest next available IST time slot."""
+    if busy is None:
+        window_start = ist_to_utc(start_ist)
+        window_end = window_start + datetime.timedelta(minutes=max_tries * 30 + duration_minutes)
+        busy = BusyIndex.for_window(window_start, window_end)
     for i in range(1, max_tries + 1):
         alt = start_ist + datetime.timedelta(minutes=i * 30)
-        if not is_conflict(alt, duration_minutes):
+        if not is_conflict(alt, duration_minutes, busy=busy):
             return alt
     return None
 
@@ -89,10 +391,32 @@ def delete_event_by_exact_match(title, date_str):
     events = get_events_by_date(date_str)
     for event in events:
         if title.lower() in event.get("summary", "").lower():
-            calendar_service.events().delete(calendarId='primary', eventId=event["id"]).execute()
+            request = get_calendar_service().events().delete(calendarId='primary', eventId=event["id"])
+            with telemetry.span("calendar.delete"):
+                request.execute()
+            event_store.remove(event["id"])
             return f"✅ Deleted event: {event['summary']} at {format_ist_time(event)}"
     return "⚠️ No matching event found."
 
+def delete_events_in_range(start_date_str, end_date_str, title=None):
+    """Delete every event between two IST dates (inclusive), optionally matching a title."""
+    start_date = datetime.date.fromisoformat(start_date_str)
+    end_date = datetime.date.fromisoformat(end_date_str)
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    events = [
+        e for e in iter_events_for_range(start_date, end_date)
+        if not title or title.lower() in e.get("summary", "").lower()
+    ]
+    if not events:
+        return "⚠️ No matching events found."
+    results = delete_events(events)
+    deleted = sum(1 for r in results if r["ok"])
+    failed = len(results) - deleted
+    if failed:
+        return f"✅ Deleted {deleted} events, ⚠️ {failed} could not be deleted."
+    return f"✅ Deleted {deleted} events."
+
 def format_ist_time(event):
     """Format event start time in IST for display."""
     utc_start = event['start'].get("dateTime") or event['start'].get("date")
@@ -100,7 +424,7 @@ def format_ist_time(event):
     return ist_time.strftime("%Y-%m-%d %H:%M")
 def get_last_meeting_time():
     """Get end time of the most recent event."""
-    now = datetime.datetime.now(UTC)
+    now = now_utc()
     past_events = list_events(now - datetime.timedelta(days=7), now)
     if not past_events:
         return None
@@ -109,7 +433,7 @@ def get_last_meeting_time():
 
 def get_usual_event_template(title_substr):
     """Return most common start time and duration for recurring events like 'sync'."""
-    now = datetime.datetime.now(UTC)
+    now = now_utc()
     past = list_events(now - datetime.timedelta(days=60), now)
     matches = [e for e in past if title_substr.lower() in e['summary'].lower()]
     if not matches:
@@ -126,22 +450,20 @@ def get_usual_event_template(title_substr):
 
     avg_duration = int(sum(durations) / len(durations))
     return {"start_time": last_start.isoformat(), "duration": avg_duration}
+def get_availability(window_start, window_end):
+    """Per-minute availability grid for an IST window, built from one fetch."""
+    busy = BusyIndex.for_window(window_start.astimezone(UTC), window_end.astimezone(UTC))
+    return AvailabilityGrid(zip(busy.starts, busy.ends), window_start, window_end)
+
 def find_next_free_slots(duration_minutes, window_days=3, granularity=30):
     """Finds next few free slots within the next `window_days`."""
-    now = datetime.datetime.now(IST)
-    slots = []
-    for day in range(window_days):
-        current = now + datetime.timedelta(days=day)
-        for hour in range(8, 20):  # Working hours
-            for minute in range(0, 60, granularity):
-                start = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                if not is_conflict(start, duration_minutes):
-                    slots.append(start)
-                if len(slots) >= 3:
-                    return slots
-    return slots
-def find_free_slots_for_day(date, duration_minutes, time_pref="any"):
-    slots = []
+    now = now_utc().astimezone(IST)
+    window_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    last_start = window_start + datetime.timedelta(days=window_days)
+    grid = get_availability(window_start, last_start + datetime.timedelta(minutes=duration_minutes))
+    # Working hours
+    return grid.free_starts(duration_minutes, granularity, hours=(8, 20), before=last_start, limit=3)
+def find_free_slots_for_day(date, duration_minutes, time_pref="any", granularity=60):
     morning_range = (7, 12)
     evening_range = (18, 22)
     full_range = (6, 22)
@@ -152,15 +474,13 @@ def find_free_slots_for_day(date, duration_minutes, time_pref="any"):
     elif time_pref == "evening":
         hours_range = evening_range
 
-    for hour in range(hours_range[0], hours_range[1]):
-        dt = IST.localize(datetime.datetime(date.year, date.month, date.day, hour, 0))
-        if not is_conflict(dt, duration_minutes):
-            slots.append(dt)
-
-    return slots
+    window_start = IST.localize(datetime.datetime(date.year, date.month, date.day, hours_range[0], 0))
+    last_start = window_start + datetime.timedelta(hours=hours_range[1] - hours_range[0])
+    grid = get_availability(window_start, last_start + datetime.timedelta(minutes=duration_minutes))
+    return grid.free_starts(duration_minutes, granularity, hours=hours_range)
 def get_event_time_by_title(title_substr):
     """Returns start time of the latest event containing given title."""
-    now = datetime.datetime.now(UTC)
+    now = now_utc()
     past_events = list_events(now - datetime.timedelta(days=60), now + datetime.timedelta(days=30))
     matches = [e for e in past_events if title_substr.lower() in e['summary'].lower()]
     if not matches:
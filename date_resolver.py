@@ -0,0 +1,190 @@
+# date_resolver.py
+# Turns date phrases ("tomorrow", "next monday", "this weekend", "last weekday
+# of this month", "a day after Team Sync") into IST dates locally, so the LLM
+# only copies spans.
+import datetime
+import re
+import pytz
+from dateutil import parser
+from dateutil.relativedelta import relativedelta, MO, TU, WE, TH, FR, SA, SU
+from dateutil.rrule import rrule, MONTHLY
+
+IST = pytz.timezone("Asia/Kolkata")
+
+WEEKDAYS = {"monday": MO, "tuesday": TU, "wednesday": WE, "thursday": TH,
+            "friday": FR, "saturday": SA, "sunday": SU}
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "last": -1}
+COUNTS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+          "six": 6, "seven": 7}
+DAY_OFFSETS = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2,
+               "yesterday": -1, "day before yesterday": -2}
+DATE_KEYS = ("date", "start_date", "end_date")
+
+WEEKDAY = "(?P<weekday>" + "|".join(WEEKDAYS) + ")"
+COUNT = r"(?P<count>\d+|" + "|".join(COUNTS) + ")"
+MONTH_REF = r"(?:this month|the month|month|next month|(?P<month_name>[a-z]+)(?: (?P<year>\d{4}))?)"
+
+IN_N = re.compile(rf"^in {COUNT} (?P<unit>days?|weeks?|months?)$")
+RELATIVE_WEEKDAY = re.compile(rf"^(?:(?P<which>this|next|coming|last) )?{WEEKDAY}(?: (?P<week>next week|this week))?$")
+NTH_IN_MONTH = re.compile(rf"^(?:the )?(?P<ordinal>{'|'.join(ORDINALS)}) (?P<kind>weekday|day|{'|'.join(WEEKDAYS)}) of {MONTH_REF}$")
+WEEK_SPAN = re.compile(r"^(?:(?P<which>this|next|coming) )?(?P<span>weekend|week)$")
+RELATIVE_TO_EVENT = re.compile(rf"^(?:{COUNT} )?(?P<unit>days?|weeks?) (?P<direction>after|before) (?:my |the )?(?P<event>.+)$")
+
+
+def today_ist():
+    return datetime.datetime.now(IST).date()
+
+
+def _normalize(phrase):
+    phrase = phrase.lower().replace("_", " ")
+    text = " ".join(re.sub(r"[^\w\s-]", " ", phrase).split())
+    return text[4:] if text.startswith("the ") else text
+
+
+def _count(value):
+    if value is None:
+        return 1
+    return int(value) if value.isdigit() else COUNTS[value]
+
+
+def _month_start(m, today):
+    """First day of the month referred to by a MONTH_REF match."""
+    text = m.group(0)
+    if text.endswith("next month"):
+        return today.replace(day=1) + relativedelta(months=1)
+    if m["month_name"] and m["month_name"] not in ("this", "the"):
+        month = parser.parse(m["month_name"]).month
+        year = int(m["year"]) if m["year"] else today.year
+        return datetime.date(year, month, 1)
+    return today.replace(day=1)
+
+
+def _nth_in_month(m, today):
+    start = _month_start(m, today)
+    pos = ORDINALS[m["ordinal"]]
+    if m["kind"] == "day":
+        return start + relativedelta(day=31) if pos < 0 else start + relativedelta(days=pos - 1)
+    weekdays = (MO, TU, WE, TH, FR) if m["kind"] == "weekday" else (WEEKDAYS[m["kind"]],)
+    rule = rrule(MONTHLY, dtstart=start, until=start + relativedelta(day=31),
+                 byweekday=weekdays, bysetpos=pos)
+    return rule[0].date()
+
+
+def resolve_span(phrase, today=None):
+    """First and last IST date of a week phrase ("this weekend", "next week"), or None.
+
+    Spans never start before today, so "this week" on a Thursday runs Thursday to Sunday.
+    """
+    today = today or today_ist()
+    m = WEEK_SPAN.match(_normalize(phrase))
+    if not m:
+        return None
+    monday = today + relativedelta(weekday=MO(-1))
+    if m["which"] == "next":
+        monday += datetime.timedelta(weeks=1)
+    first = monday + datetime.timedelta(days=5 if m["span"] == "weekend" else 0)
+    return max(first, today), monday + datetime.timedelta(days=6)
+
+
+def resolve_date(phrase, today=None, find_event=None):
+    """Resolve a date phrase to a datetime.date in IST, or None if it isn't understood.
+
+    `find_event(title)` should return the datetime of an event by title; it is
+    only needed for phrases like "a day after Team Sync".
+
+    Checks (run with `python -m doctest date_resolver.py`):
+
+    >>> wed = datetime.date(2025, 7, 2)
+    >>> resolve_date("2024-02-29", wed), resolve_date("2025-02-29", wed), resolve_date("2025-13-01", wed)
+    (datetime.date(2024, 2, 29), None, None)
+    >>> resolve_date("the day after tomorrow", wed), resolve_date("next friday", wed)
+    (datetime.date(2025, 7, 4), datetime.date(2025, 7, 11))
+    >>> resolve_date("third day of august", wed), resolve_date("last day of february 2024", wed)
+    (datetime.date(2025, 8, 3), datetime.date(2024, 2, 29))
+    >>> resolve_span("this weekend", wed), resolve_span("next week", wed)[0]
+    ((datetime.date(2025, 7, 5), datetime.date(2025, 7, 6)), datetime.date(2025, 7, 7))
+    """
+    today = today or today_ist()
+    text = _normalize(phrase)
+    if not text:
+        return None
+
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+        try:
+            return datetime.date.fromisoformat(text)
+        except ValueError:
+            return None  # e.g. 2025-02-30
+    if text in DAY_OFFSETS:
+        return today + datetime.timedelta(days=DAY_OFFSETS[text])
+
+    m = IN_N.match(text)
+    if m:
+        unit = m["unit"].rstrip("s")
+        return today + relativedelta(**{unit + "s": _count(m["count"])})
+
+    m = RELATIVE_WEEKDAY.match(text)
+    if m:
+        weekday = WEEKDAYS[m["weekday"]]
+        if m["which"] == "last":
+            return today + relativedelta(days=-1, weekday=weekday(-1))
+        if m["which"] == "next" or m["week"] == "next week":
+            # "next friday" is the friday of next week
+            next_week = today + relativedelta(days=1, weekday=MO(+1))
+            return next_week + relativedelta(weekday=weekday(+1))
+        return today + relativedelta(weekday=weekday(+1))
+
+    span = resolve_span(text, today)
+    if span:
+        return span[0]
+
+    m = NTH_IN_MONTH.match(text)
+    if m:
+        try:
+            return _nth_in_month(m, today)
+        except (ValueError, IndexError, OverflowError):
+            return None
+
+    m = RELATIVE_TO_EVENT.match(text)
+    if m and find_event is not None:
+        event_time = find_event(m["event"])
+        if event_time is None:
+            return None
+        days = _count(m["count"]) * (7 if m["unit"].startswith("week") else 1)
+        if m["direction"] == "before":
+            days = -days
+        return event_time.astimezone(IST).date() + datetime.timedelta(days=days)
+
+    # Absolute dates like "july 22", "22nd july 2025"
+    try:
+        return parser.parse(text, default=datetime.datetime.combine(today, datetime.time())).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def resolve_action_dates(action, today=None, find_event=None):
+    """Replace date phrases in an action's date fields with ISO dates.
+
+    An `end_date` that would land before `start_date` is counted from the start
+    instead. Returns the updated action, or an "ask" action naming a phrase
+    that could not be resolved.
+    """
+    for key in DATE_KEYS:
+        value = action.get(key)
+        if not isinstance(value, str):
+            continue
+        span = resolve_span(value, today)
+        if key == "end_date" and span:
+            resolved = span[1]  # "until next week" runs to its sunday
+        else:
+            resolved = resolve_date(value, today, find_event)
+        if resolved is None:
+            return {"action": "ask", "question": f"Which date do you mean by '{value}'?"}
+        start = action.get("start_date")
+        if key == "end_date" and isinstance(start, str) and resolved.isoformat() < start:
+            # "monday" to "friday" on a wednesday: count the end from the start, not from today
+            resolved = resolve_date(value, datetime.date.fromisoformat(start), find_event) or resolved
+        action[key] = resolved.isoformat()
+        if key == "start_date" and span and action.get("action") == "delete_range" and not action.get("end_date"):
+            # "delete everything next week" covers the whole week
+            action["end_date"] = span[1].isoformat()
+    return action
@@ -0,0 +1,201 @@
+# fake_calendar.py
+# In-memory stand-in for the Calendar `events()` service surface used by
+# calendar_utils: list (with pagination and sync tokens), insert, delete,
+# patch and batch requests. Install it with calendar_utils.set_calendar_service.
+# Every round-trip is counted (per method, plus response bytes) and can be
+# given an artificial latency, for replays and benchmark.py.
+import datetime
+import itertools
+import json
+import re
+import time
+from collections import Counter
+
+PAGE_SIZE = 250  # Calendar API default maxResults
+
+
+class FakeHttpError(Exception):
+    """Mimics googleapiclient's HttpError closely enough for calendar_utils."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status} {message}")
+        self.resp = type("Response", (), {"status": status})()
+
+
+def _parse(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _bounds(event):
+    bounds = []
+    for key in ("start", "end"):
+        value = event[key].get("dateTime") or event[key]["date"] + "T00:00:00+05:30"
+        bounds.append(_parse(value))
+    return tuple(bounds)
+
+
+def _project(event, fields):
+    """Apply a `fields=...items(a,b,c)` partial-response mask to one event."""
+    match = re.search(r"items\(([^)]*)\)", fields or "")
+    if not match:
+        return dict(event)
+    keep = match.group(1).split(",")
+    return {k: v for k, v in event.items() if k in keep}
+
+
+class _Request:
+    def __init__(self, service, method, run):
+        self.service = service
+        self.method = method
+        self.run = run
+
+    def execute(self):
+        self.service.calls[self.method] += 1
+        return self.service._round_trip(self.run())
+
+
+class _Events:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, calendarId="primary", timeMin=None, timeMax=None, singleEvents=True,
+             orderBy=None, pageToken=None, syncToken=None, fields=None, maxResults=None):
+        return _Request(self.service, "list", lambda: self.service._list(
+            timeMin, timeMax, pageToken, syncToken, fields, maxResults or self.service.page_size))
+
+    def insert(self, calendarId="primary", body=None):
+        return _Request(self.service, "insert", lambda: self.service._insert(body))
+
+    def delete(self, calendarId="primary", eventId=None):
+        return _Request(self.service, "delete", lambda: self.service._delete(eventId))
+
+    def patch(self, calendarId="primary", eventId=None, body=None):
+        return _Request(self.service, "patch", lambda: self.service._patch(eventId, body))
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self.requests.append((request_id or str(len(self.requests)), request, callback or self.callback))
+
+    def execute(self):
+        self.service.calls["batch"] += 1
+        outcomes = []
+        for request_id, request, callback in self.requests:
+            try:
+                response, error = request.run(), None
+            except FakeHttpError as e:
+                response, error = None, e
+            self.service.calls[request.method] += 1
+            outcomes.append((callback, request_id, response, error))
+        self.service._round_trip([response for _, _, response, _ in outcomes])
+        for callback, request_id, response, error in outcomes:
+            callback(request_id, response, error)
+
+
+class FakeCalendarService:
+    """In-memory primary calendar answering the subset of the API calendar_utils uses.
+
+    `calls` counts requests per method (batched requests under their own
+    method, plus one "batch" per batch), `round_trips` and `bytes` count HTTP
+    round-trips and response JSON size, and each round-trip sleeps `latency`
+    seconds.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE, latency=0.0):
+        self.page_size = page_size
+        self.latency = latency
+        self.events_by_id = {}
+        self.bounds = {}  # event id -> (start, end)
+        self.changes = []  # (sequence number, event snapshot), for sync tokens
+        self.ids = itertools.count(1)
+        self._query = (None, None)  # (key, matching events) of the last time-range list
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.calls = Counter()
+        self.round_trips = 0
+        self.bytes = 0
+
+    def _round_trip(self, response):
+        self.round_trips += 1
+        self.bytes += len(json.dumps(response))
+        if self.latency:
+            time.sleep(self.latency)
+        return response
+
+    def add_event(self, summary, start, end):
+        """Seed an event from aware datetimes without counting an API call."""
+        return self._insert({
+            "summary": summary,
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": end.isoformat()},
+        })
+
+    def load(self, events):
+        """Seed API-shaped event bodies (`summary`, `start`, `end`), e.g. from a recorded session."""
+        for event in events:
+            self._insert({k: event[k] for k in ("summary", "start", "end") if k in event})
+
+    def events(self):
+        return _Events(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def _record(self, event):
+        self.changes.append((len(self.changes) + 1, dict(event)))
+
+    def _insert(self, body):
+        event = dict(body, id=f"evt{next(self.ids)}", status="confirmed")
+        self.events_by_id[event["id"]] = event
+        self.bounds[event["id"]] = _bounds(event)
+        self._record(event)
+        return dict(event)
+
+    def _delete(self, event_id):
+        event = self.events_by_id.pop(event_id, None)
+        if event is None:
+            raise FakeHttpError(404, "Not Found")
+        del self.bounds[event_id]
+        self._record({"id": event_id, "status": "cancelled"})
+        return ""
+
+    def _patch(self, event_id, body):
+        if event_id not in self.events_by_id:
+            raise FakeHttpError(404, "Not Found")
+        event = self.events_by_id[event_id]
+        event.update(body)
+        self.bounds[event_id] = _bounds(event)
+        self._record(event)
+        return dict(event)
+
+    def _matching(self, time_min, time_max):
+        """Events overlapping [time_min, time_max) by start; reused while paging one query."""
+        key = (time_min, time_max, len(self.changes))
+        if self._query[0] != key:
+            lo = _parse(time_min) if time_min else None
+            hi = _parse(time_max) if time_max else None
+            ids = [i for i, (start, end) in self.bounds.items()
+                   if (lo is None or end > lo) and (hi is None or start < hi)]
+            ids.sort(key=lambda i: self.bounds[i][0])
+            self._query = (key, [self.events_by_id[i] for i in ids])
+        return self._query[1]
+
+    def _list(self, time_min, time_max, page_token, sync_token, fields, page_size):
+        if sync_token is not None:
+            items = [event for _, event in self.changes[int(sync_token):]]
+        else:
+            items = self._matching(time_min, time_max)
+
+        offset = int(page_token or 0)
+        page = {"items": [_project(e, fields) for e in items[offset:offset + page_size]]}
+        if offset + page_size < len(items):
+            page["nextPageToken"] = str(offset + page_size)
+        else:
+            page["nextSyncToken"] = str(len(self.changes))
+        return page
@@ -0,0 +1,194 @@
+# headless.py
+# Drives the app.main loop with text instead of the microphone and speaker.
+#
+#   python headless.py                          # type utterances on stdin
+#   python headless.py --script turns.txt       # one utterance per line
+#   python headless.py --script turns.txt --record session.jsonl
+#   python headless.py --replay session.jsonl   # stub LLM + in-memory calendar
+#
+# A recorded session is JSON lines: a header {"today", "now", "events"}
+# followed by one {"user", "llm", "said"} object per turn. Replays pin the
+# date and the calendar clock to the header, feed the recorded LLM output
+# back per turn and run against a FakeCalendarService seeded with the
+# header's events, so they are deterministic and need no network.
+import argparse
+import datetime
+import json
+import statistics
+import sys
+import time
+
+import app
+from calendar_utils import IST, event_store, now_utc, set_calendar_service, set_clock
+from date_resolver import today_ist
+from intent_parser import hit_rate
+from fake_calendar import FakeCalendarService
+from mistral_llm import extract_first_json, get_action
+from summarizer import RollingSummarizer
+from telemetry import telemetry
+
+
+class TextSession:
+    """Text stand-in for the microphone and speaker that records each turn."""
+
+    def __init__(self, utterances):
+        self.utterances = iter(utterances)
+        self.greeting = []
+        self.turns = []
+        self.started = None
+
+    def _close_turn(self):
+        if self.started is not None:
+            self.turns[-1]["ms"] = round((time.perf_counter() - self.started) * 1000, 2)
+            self.started = None
+
+    def listen(self):
+        # app.main drains speech before listening, so the previous turn is complete
+        self._close_turn()
+        utterance = next(self.utterances, None)
+        if utterance is None:
+            return None
+        self.turns.append({"user": utterance, "llm": None, "said": []})
+        self.started = time.perf_counter()
+        return utterance
+
+    def speak(self, text):
+        print(f"🤖 {text}")
+        (self.turns[-1]["said"] if self.turns else self.greeting).append(text)
+
+    def recording(self, llm_action):
+        """Wrap `llm_action` so each turn remembers the raw LLM output."""
+        def action(messages, utterance, memory, today=None):
+            parsed, text = llm_action(messages, utterance, memory, today=today)
+            self.turns[-1]["llm"] = text
+            return parsed, text
+        return action
+
+    def replaying(self, recorded):
+        """Stub LLM answering each turn with the output recorded for it."""
+        def action(messages, utterance, memory, today=None):
+            text = recorded[len(self.turns) - 1].get("llm") or ""
+            return extract_first_json(text), text
+        return action
+
+
+def _stdin_utterances():
+    while True:
+        try:
+            utterance = input("You: ").strip()
+        except EOFError:
+            return
+        if utterance:
+            yield utterance
+
+
+def _script_utterances(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def _load_session(path):
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    return lines[0], lines[1:]
+
+
+def _stub_summarizer():
+    return RollingSummarizer(summarize=lambda new_turns, previous: previous)
+
+
+def _report_timing(turns):
+    times = sorted(t["ms"] for t in turns if "ms" in t)
+    if not times:
+        return
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"⏱️ {len(times)} turns: mean {statistics.mean(times):.1f} ms, "
+          f"p95 {p95:.1f} ms, max {times[-1]:.1f} ms")
+    print(f"⚡ Fast path answered {hit_rate():.0%} of utterances without the LLM")
+
+
+def _noon_ist(day):
+    """A fixed "now" on `day`, used when only a date is pinned."""
+    return IST.localize(datetime.datetime.combine(day, datetime.time(12)))
+
+
+def _snapshot_events():
+    """The mirrored calendar as API-shaped bodies, to seed a replay's fake calendar."""
+    event_store.sync(force=True)
+    return [{k: e[k] for k in ("summary", "start", "end") if k in e}
+            for e in event_store.events.values()]
+
+
+def record(session, path, header):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for turn in session.turns:
+            f.write(json.dumps({k: turn[k] for k in ("user", "llm", "said")}) + "\n")
+    print(f"💾 Recorded {len(session.turns)} turns to {path}")
+
+
+def replay(path):
+    """Re-run a recorded session offline; returns the number of turns whose replies changed."""
+    header, recorded = _load_session(path)
+    today = datetime.date.fromisoformat(header["today"])
+    now = datetime.datetime.fromisoformat(header["now"]) if header.get("now") else _noon_ist(today)
+    set_clock(lambda: now)
+    service = FakeCalendarService()
+    service.load(header.get("events", []))
+    set_calendar_service(service)
+    telemetry.path = None  # keep replays out of the production timings file
+
+    session = TextSession(turn["user"] for turn in recorded)
+    try:
+        app.main(listen=session.listen, speak=session.speak, llm_action=session.replaying(recorded),
+                 summarizer=_stub_summarizer(), today=today)
+    finally:
+        set_clock(None)
+
+    mismatches = 0
+    for i, (expected, actual) in enumerate(zip(recorded, session.turns), 1):
+        if expected.get("said") != actual["said"]:
+            mismatches += 1
+            print(f"❌ Turn {i} ({expected['user']!r}):\n   expected {expected.get('said')}\n   got      {actual['said']}")
+    print(f"{'✅' if not mismatches else '❌'} {len(recorded) - mismatches}/{len(recorded)} turns matched")
+    print(f"📞 Calendar API calls: {dict(service.calls)}")
+    _report_timing(session.turns)
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the scheduler with text I/O.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--script", help="file with one utterance per line (# for comments)")
+    source.add_argument("--replay", help="recorded session (JSON lines) to re-run offline")
+    parser.add_argument("--record", help="write the session to this JSON lines file")
+    parser.add_argument("--today", type=datetime.date.fromisoformat,
+                        help="pin the current date (YYYY-MM-DD) for date phrases")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        return 1 if replay(args.replay) else 0
+
+    utterances = _script_utterances(args.script) if args.script else _stdin_utterances()
+    session = TextSession(utterances)
+    llm_action = get_action
+    if args.today:
+        pinned = _noon_ist(args.today)
+        set_clock(lambda: pinned)
+    if args.record:
+        # Snapshot before the session mutates the calendar
+        header = {"today": (args.today or today_ist()).isoformat(), "now": now_utc().isoformat(),
+                  "events": _snapshot_events()}
+        llm_action = session.recording(get_action)
+    app.main(listen=session.listen, speak=session.speak, llm_action=llm_action, today=args.today)
+    _report_timing(session.turns)
+    if args.record:
+        record(session, args.record, header)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# intent_parser.py
+# Rule-based fast path for common commands. Emits the same action dicts as
+# the LLM (see prompt.SYSTEM_PROMPT) and returns None when unsure.
+import calendar
+import datetime
+import re
+from date_resolver import WEEKDAYS, resolve_date, today_ist
+
+stats = {"hits": 0, "misses": 0}
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                "ten": 10, "fifteen": 15, "twenty": 20, "thirty": 30, "forty five": 45, "ninety": 90}
+
+DAY = (r"(?P<day>today|tomorrow|day after tomorrow|yesterday|\d{4}-\d{2}-\d{2}|"
+       r"(?:this |next )?(?:" + "|".join(WEEKDAYS) + "))")
+MONTH = r"(?P<month>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")"
+EVENTS = r"(?:my |all )?(?:events|meetings|schedule|calendar)"
+LIST_VERB = r"(?:list|show(?: me)?|what(?:s| is)? on|what do i have)"
+
+LIST_DAY = re.compile(rf"^{LIST_VERB}(?: {EVENTS})?(?: on| for)? {DAY}$")
+LIST_MONTH = re.compile(rf"^{LIST_VERB}(?: {EVENTS})?(?: in| for)? {MONTH}(?: (?P<year>\d{{4}}))?$")
+LIST_YEAR = re.compile(rf"^{LIST_VERB}(?: {EVENTS})?(?: in| for) (?P<year>\d{{4}})$")
+DELETE_ALL_MONTH = re.compile(rf"^(?:delete|remove|clear) (?:all )?{EVENTS}?(?: in| for)? {MONTH}(?: (?P<year>\d{{4}}))?$")
+DELETE_ALL_DAY = re.compile(rf"^(?:delete|remove|clear|cancel) (?:all|every)(?: of)?(?: my| the)? (?:events?|meetings?)(?: on| for)? {DAY}$")
+DELETE_ONE = re.compile(rf"^(?:delete|remove|cancel) (?:my |the )?(?P<title>[a-z0-9][\w -]*?)(?: meeting| event)?(?: on)? {DAY}$")
+FIND_TIME = re.compile(
+    rf"^(?:find|get|book)(?: me)?(?: a)? (?P<amount>\d+|half an|{'|'.join(NUMBER_WORDS)}) "
+    rf"(?P<unit>minutes?|mins?|hours?|hrs?)(?: slot| meeting)?(?: on| for)? {DAY}"
+    r"(?: (?:in the )?(?P<pref>morning|afternoon|evening))?$"
+)
+
+
+# Titles that name no particular event ("my meeting", "all events"); left to the LLM
+GENERIC_TITLE_WORDS = {"all", "every", "each", "everything", "event", "events", "meeting", "meetings",
+                       "it", "this", "that", "my", "the", "of", "calendar", "schedule"}
+
+
+def _is_generic_title(title):
+    words = title.split()
+    return words[0] in ("all", "every", "each") or all(w in GENERIC_TITLE_WORDS for w in words)
+
+
+def _normalize(text):
+    text = re.sub(r"['’]", "", text.lower())
+    return " ".join(re.sub(r"[^\w\s-]", " ", text).split())
+
+
+def _resolve_day(day, today):
+    resolved = resolve_date(day, today)
+    if resolved is None:
+        raise ValueError(f"unresolvable date {day!r}")
+    return resolved.isoformat()
+
+
+def _duration(amount, unit):
+    if amount == "half an":
+        return 30
+    n = int(amount) if amount.isdigit() else NUMBER_WORDS[amount]
+    return n * 60 if unit.startswith(("hour", "hr")) else n
+
+
+def _month_range(month, year):
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, 1).isoformat(), datetime.date(year, month, last_day).isoformat()
+
+
+def _match(text, today):
+    m = LIST_DAY.match(text)
+    if m:
+        return {"action": "list", "date": _resolve_day(m["day"], today)}
+    m = LIST_MONTH.match(text)
+    if m:
+        return {"action": "list", "year": int(m["year"] or today.year), "month": MONTHS[m["month"]]}
+    m = LIST_YEAR.match(text)
+    if m:
+        return {"action": "list", "year": int(m["year"])}
+    m = DELETE_ALL_MONTH.match(text)
+    if m:
+        start, end = _month_range(MONTHS[m["month"]], int(m["year"] or today.year))
+        return {"action": "delete_range", "start_date": start, "end_date": end}
+    m = DELETE_ALL_DAY.match(text)
+    if m:
+        day = _resolve_day(m["day"], today)
+        return {"action": "delete_range", "start_date": day, "end_date": day}
+    m = FIND_TIME.match(text)
+    if m:
+        return {
+            "action": "find_time",
+            "duration": _duration(m["amount"], m["unit"]),
+            "start_date": _resolve_day(m["day"], today),
+            "time_pref": m["pref"] or "any",
+        }
+    m = DELETE_ONE.match(text)
+    if m and not _is_generic_title(m["title"]):
+        return {"action": "delete", "title": m["title"], "date": _resolve_day(m["day"], today)}
+    return None
+
+
+def parse_intent(utterance, today=None):
+    """Return an action dict for a high-confidence utterance, else None (use the LLM).
+
+    Checks (run with `python -m doctest intent_parser.py`):
+
+    >>> wed = datetime.date(2025, 7, 2)
+    >>> parse_intent("What's on tomorrow?", wed)
+    {'action': 'list', 'date': '2025-07-03'}
+    >>> parse_intent("delete team sync on 2025-07-04", wed)
+    {'action': 'delete', 'title': 'team sync', 'date': '2025-07-04'}
+    >>> parse_intent("delete all events on friday", wed)
+    {'action': 'delete_range', 'start_date': '2025-07-04', 'end_date': '2025-07-04'}
+    >>> parse_intent("delete my meeting tomorrow", wed) is None  # generic title
+    True
+    >>> parse_intent("remove everything tomorrow", wed) is None
+    True
+    >>> parse_intent("list events on 2025-02-30", wed) is None  # impossible date
+    True
+    >>> parse_intent("delete team sync 2025-13-01", wed) is None
+    True
+    >>> parse_intent("find 30 minutes on 2025-02-29", wed) is None
+    True
+    """
+    try:
+        action = _match(_normalize(utterance), today or today_ist())
+    except ValueError:
+        action = None  # e.g. an impossible date like 2025-02-30; the LLM or a date ask takes over
+    stats["hits" if action else "misses"] += 1
+    return action
+
+
+def hit_rate():
+    """Share of utterances answered by the fast path so far."""
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
@@ -0,0 +1,56 @@
+# listing.py
+# Turns an event listing into a full printed list plus a few coalesced
+# spoken utterances, instead of one TTS call per event.
+import datetime
+import itertools
+from calendar_utils import utc_to_ist
+
+MAX_SPOKEN_EVENTS = 8  # events read out before summarizing the rest as "N more"
+MAX_UTTERANCE_CHARS = 300  # day phrases are joined into utterances up to this length
+
+
+def _start_ist(event):
+    """(IST date, spoken time) for an event's start; all-day events have no time."""
+    start = event["start"]
+    if start.get("dateTime"):
+        dt = utc_to_ist(start["dateTime"])
+        return dt.date(), dt.strftime("%H:%M")
+    return datetime.date.fromisoformat(start["date"]), None
+
+
+def _event_phrase(event, time):
+    title = event.get("summary", "Untitled event")
+    return f"{title} at {time}" if time else f"{title}, all day"
+
+
+def render_listing(events, max_spoken=MAX_SPOKEN_EVENTS):
+    """Return (lines, utterances) for start-ordered `events`.
+
+    `lines` lists every event for printing; `utterances` groups up to
+    `max_spoken` events by day into a handful of sentences, ending with
+    "And N more." when the listing was capped.
+    """
+    lines, day_phrases, spoken, extra = [], [], 0, 0
+    dated = ((_start_ist(e), e) for e in events)
+    for day, group in itertools.groupby(dated, key=lambda item: item[0][0]):
+        phrases = []
+        for (_, time), event in group:
+            lines.append(f"📅 {day.isoformat()} {time or 'all day'} — {event.get('summary', 'Untitled event')}")
+            if spoken < max_spoken:
+                phrases.append(_event_phrase(event, time))
+                spoken += 1
+            else:
+                extra += 1
+        if phrases:
+            day_phrases.append(f"On {day.strftime('%A, %B')} {day.day}: {', '.join(phrases)}")
+
+    utterances = []
+    for phrase in day_phrases:
+        if utterances and len(utterances[-1]) + len(phrase) + 2 <= MAX_UTTERANCE_CHARS:
+            utterances[-1] += f"; o{phrase[1:]}"
+        else:
+            utterances.append(phrase)
+    utterances = [u + "." for u in utterances]
+    if extra:
+        utterances.append(f"And {extra} more event{'s' if extra > 1 else ''}.")
+    return lines, utterances
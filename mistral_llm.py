@@ -1,21 +1,110 @@
 import requests
+import copy
 import json
+import random
 import re
+import threading
+import time
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
 from config import MISTRAL_API_KEY, MISTRAL_API_URL
+from date_resolver import today_ist
+from telemetry import telemetry
+from token_budget import record_api_usage
 
-def extract_first_json(text):
-    try:
-        match = re.search(r'\{.*?\}', text, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-    except json.JSONDecodeError:
-        return None
-
-def call_mistral(messages):
-    headers = {
+MISTRAL_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+MISTRAL_MAX_RETRIES = 3
+MISTRAL_BACKOFF = 0.5  # base seconds, doubled per attempt and jittered
+MAX_RETRY_DELAY = 5.0  # seconds; caps Retry-After so a busy API can't stall the voice loop
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+ACTION_CACHE_SIZE = 256
+ACTION_CACHE_TTL = 30 * 60  # seconds
+CACHEABLE_ACTIONS = {"list", "find_time"}  # read-only, so a stale hit can't change the calendar
+ACTION_JSON_MODE = True  # ask Mistral to constrain action replies to a JSON object
+
+def _build_session():
+    """Keep-alive session shared by every call, so turns reuse the TCP+TLS connection."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
         "Authorization": f"Bearer {MISTRAL_API_KEY}",
         "Content-Type": "application/json"
-    }
+    })
+    return session
+
+_session = _build_session()
+
+def _backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header up to MAX_RETRY_DELAY."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+    return random.uniform(0, MISTRAL_BACKOFF * (2 ** attempt))
+
+class JSONObjectScanner:
+    """Incremental, string-aware brace scanner that emits top-level JSON objects as they close."""
+
+    def __init__(self):
+        self.parts = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text):
+        """Consume the next chunk of text; returns the objects completed within it."""
+        objects = []
+        start = 0 if self.depth else None
+        for i, ch in enumerate(text):
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth, start = 1, i
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(text[start:i + 1])
+                    candidate, self.parts, start = "".join(self.parts), [], None
+                    try:
+                        objects.append(json.loads(candidate))
+                    except json.JSONDecodeError:
+                        pass
+        if self.depth and start is not None:
+            self.parts.append(text[start:])
+        return objects
+
+def extract_all_json(text):
+    """Every complete top-level JSON object in `text`, in order (single linear pass)."""
+    return JSONObjectScanner().feed(text)
+
+def extract_first_json(text):
+    """First complete JSON object in `text`, or None; nested braces and braces in strings are fine."""
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        # Fast path: the reply is pure JSON, as the prompt asks
+        try:
+            parsed = json.loads(stripped)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    objects = extract_all_json(text)
+    return objects[0] if objects else None
+
+def _payload(messages, json_mode=False):
     payload = {
         "model": "mistral-tiny",
         "messages": messages,
@@ -23,11 +112,154 @@ def call_mistral(messages):
         "max_tokens": 512,
         "tool_choice": "none"
     }
-    response = requests.post(MISTRAL_API_URL, headers=headers, json=payload)
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+    return payload
+
+def _post(payload, stream=False):
+    """POST to the Mistral API with timeouts and jittered retries on 429/5xx."""
+    for attempt in range(MISTRAL_MAX_RETRIES + 1):
+        try:
+            with telemetry.span("mistral.request"):
+                response = _session.post(MISTRAL_API_URL, json=payload, timeout=MISTRAL_TIMEOUT, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MISTRAL_MAX_RETRIES:
+                raise
+            print(f"\U0001F7E1 Mistral request failed ({e}), retrying...")
+            time.sleep(_backoff_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUSES and attempt < MISTRAL_MAX_RETRIES:
+            print("\U0001F7E1 Mistral API busy:", response.status_code, "- retrying...")
+            response.close()
+            time.sleep(_backoff_delay(attempt, response))
+            continue
+        break
 
     if response.status_code != 200:
         print("\U0001F534 Mistral API Error:", response.status_code, response.text)
         raise Exception(f"{response.status_code} {response.reason}")
+    return response
+
+def call_mistral(messages, json_mode=False):
+    result = _post(_payload(messages, json_mode)).json()
+    record_api_usage(result.get("usage"))
+    return result["choices"][0]["message"]["content"]
+
+def stream_mistral(messages, json_mode=False):
+    """Yield content deltas of a streamed (SSE) completion as they arrive."""
+    payload = _payload(messages, json_mode)
+    payload["stream"] = True
+    response = _post(payload, stream=True)
+    response.encoding = "utf-8"
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            record_api_usage(chunk.get("usage"))
+            if not chunk.get("choices"):
+                continue
+            delta = chunk["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+    finally:
+        response.close()
+
+def _drain(stream):
+    """Read the rest of a stream, so its final chunk's `usage` is recorded, then close it."""
+    try:
+        for _ in stream:
+            pass
+    except Exception as e:
+        print("\U0001F7E1 Mistral stream ended early:", e)
+    finally:
+        stream.close()
+
+def call_mistral_action(messages):
+    """Stream a completion and return (first JSON object, text so far) as soon as that object closes.
+
+    The prompt asks for a single object per reply, so the rest of the stream is
+    only drained on a background thread, for the token usage Mistral sends last.
+    """
+    scanner = JSONObjectScanner()
+    parts = []
+    stream = stream_mistral(messages, json_mode=ACTION_JSON_MODE)
+    handed_off = False
+    try:
+        for delta in stream:
+            parts.append(delta)
+            objects = scanner.feed(delta)
+            if objects:
+                threading.Thread(target=_drain, args=(stream,), daemon=True).start()
+                handed_off = True
+                return objects[0], "".join(parts)
+    finally:
+        if not handed_off:
+            stream.close()
+    return None, "".join(parts)
+
+
+def normalize_utterance(text):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variations share a cache key."""
+    text = re.sub(r"['’]", "", text.lower())
+    return " ".join(re.sub(r"[^\w\s:-]", " ", text).split())
+
+
+class ActionCache:
+    """LRU cache with TTL for parsed actions.
+
+    Keys include today's date, so an utterance like "what's on tomorrow" is
+    re-resolved by the LLM each day instead of replaying yesterday's dates.
+    """
+
+    def __init__(self, max_size=ACTION_CACHE_SIZE, ttl=ACTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(utterance, memory, today=None):
+        today = today or today_ist()
+        # Serialised, so list or dict slot values from the LLM still make a hashable key
+        return normalize_utterance(utterance), today.isoformat(), json.dumps(memory, sort_keys=True, default=str)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, action):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), copy.deepcopy(action))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+action_cache = ActionCache()
 
-    return response.json()["choices"][0]["message"]["content"]
+def get_action(messages, utterance, memory, today=None):
+    """Return (parsed action, raw text) for a turn, skipping the network on a cache hit.
 
+    `today` (IST) is part of the cache key; it defaults to the current IST date.
+    """
+    key = action_cache.key(utterance, memory, today)
+    cached = action_cache.get(key)
+    if cached is not None:
+        return cached, json.dumps(cached)
+    parsed, text = call_mistral_action(messages)
+    if parsed and parsed.get("action") in CACHEABLE_ACTIONS:
+        action_cache.put(key, parsed)
+    return parsed, text
@@ -0,0 +1,61 @@
+# pipeline.py
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TurnPipeline:
+    """Overlaps the independent stages of a turn on worker threads.
+
+    - `prefetch` warms calendar state while the LLM is still thinking
+    - `say` queues speech on a single ordered TTS thread, so synthesis and
+      playback overlap with calendar reads and writes
+    - `drain` waits for queued speech, e.g. before listening again
+    - `close` stops the speaker thread and the workers once the loop ends
+    """
+
+    def __init__(self, speak, workers=2):
+        self._speak = speak
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="turn")
+        self.speech = queue.Queue()
+        self.speaker = threading.Thread(target=self._speaker, daemon=True)
+        self.speaker.start()
+
+    def _speaker(self):
+        while True:
+            text = self.speech.get()
+            if text is None:
+                self.speech.task_done()
+                return
+            try:
+                self._speak(text)
+            except Exception as e:
+                print(f"❌ TTS error: {e}")
+            finally:
+                self.speech.task_done()
+
+    def say(self, text):
+        self.speech.put(text)
+
+    def drain(self):
+        self.speech.join()
+
+    def close(self):
+        """Finish queued speech and background work, then stop all threads."""
+        self.speech.put(None)
+        self.speaker.join()
+        self.executor.shutdown(wait=True)
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def prefetch(self, fn, *args, **kwargs):
+        """Run `fn` in the background; failures are logged, the foreground call will retry."""
+        future = self.submit(fn, *args, **kwargs)
+        future.add_done_callback(_log_failure)
+        return future
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        print("Prefetch failed:", future.exception())
@@ -0,0 +1,95 @@
+# stt.py
+# Speech-to-text backends. Each turns a speech_recognition AudioData into
+# text (or None when nothing intelligible was said).
+import json
+import speech_recognition as sr
+
+STT_LANGUAGE = "en-IN"
+VOSK_MODEL_PATH = "models/vosk-model-small-en-in-0.4"  # unpacked from https://alphacephei.com/vosk/models
+VOSK_SAMPLE_RATE = 16000
+
+
+class STTBackend:
+    """Interface for speech-to-text engines."""
+
+    name = "base"
+    streaming = False  # True if `stream` decodes incrementally
+    sample_rate = None  # capture rate `stream` expects, if it needs one
+
+    def transcribe(self, audio):
+        """Text for a finished utterance (sr.AudioData), or None."""
+        raise NotImplementedError
+
+    def stream(self, chunks):
+        """Yield (text, is_final) while consuming raw 16-bit mono PCM chunks.
+
+        Engines without incremental decoding only support `transcribe`.
+        """
+        raise NotImplementedError(f"{self.name} does not support streaming")
+
+
+class GoogleSTT(STTBackend):
+    """Google Web Speech API through speech_recognition (network round-trip)."""
+
+    name = "google"
+
+    def __init__(self, language=STT_LANGUAGE):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"STT error: {e}")
+            return None
+
+
+class VoskSTT(STTBackend):
+    """Offline CPU recognizer using a local Vosk (Kaldi) model, with partial results."""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, sample_rate=VOSK_SAMPLE_RATE):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("The vosk backend needs `pip install vosk` and a model at " + model_path)
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+        self.sample_rate = sample_rate
+
+    def _recognizer(self):
+        return self.vosk.KaldiRecognizer(self.model, self.sample_rate)
+
+    def transcribe(self, audio):
+        recognizer = self._recognizer()
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        return json.loads(recognizer.FinalResult()).get("text") or None
+
+    def stream(self, chunks):
+        recognizer = self._recognizer()
+        for chunk in chunks:
+            if recognizer.AcceptWaveform(chunk):
+                text = json.loads(recognizer.Result()).get("text")
+                if text:
+                    yield text, True
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial")
+                if partial:
+                    yield partial, False
+        text = json.loads(recognizer.FinalResult()).get("text")
+        if text:
+            yield text, True
+
+
+BACKENDS = {"google": GoogleSTT, "vosk": VoskSTT}
+
+def get_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,80 @@
+# summarizer.py
+import threading
+from mistral_llm import call_mistral
+from telemetry import telemetry
+from token_budget import CHARS_PER_TOKEN, estimate_tokens
+
+SUMMARY_TOKEN_BUDGET = 200  # cap on the rolling summary
+TURN_TOKEN_BUDGET = 600  # cap on new turns folded in per LLM call
+
+def summarize_conversation(new_turns, previous_summary=""):
+    """
+    Ask the LLM to fold new turns into the previous summary.
+    Only the new turns are sent, so the prompt size stays bounded.
+    """
+    prompt = (
+        f"Previous summary:\n{previous_summary}\n\nNew turns:\n{new_turns}\n\n"
+        f"Provide an updated, concise summary in under {SUMMARY_TOKEN_BUDGET} tokens:"
+    )
+    summary_response = call_mistral([{"role":"system","content":"Summarize the conversation."},
+                                     {"role":"user","content":prompt}])
+    # Hard cap in case the model ignores the budget; the tail holds the newest context
+    return summary_response.strip()[-SUMMARY_TOKEN_BUDGET * CHARS_PER_TOKEN:]
+
+
+class RollingSummarizer:
+    """Folds new turns into a running summary on a background thread.
+
+    `latest()` never blocks: it returns the most recently completed summary.
+    """
+
+    def __init__(self, summarize=summarize_conversation):
+        self.summarize = summarize
+        self.summary = ""
+        self.pending = []
+        self.running = False
+        self.lock = threading.Lock()
+
+    def add_turn(self, speaker, text):
+        with self.lock:
+            self.pending.append(f"{speaker}: {text}")
+            if self.running:
+                return  # the running worker picks it up
+            self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def latest(self):
+        with self.lock:
+            return self.summary
+
+    def _take_batch(self):
+        """Pop the oldest pending turns that fit in TURN_TOKEN_BUDGET (at least one)."""
+        batch, used = [], 0
+        while self.pending:
+            cost = estimate_tokens(self.pending[0])
+            if batch and used + cost > TURN_TOKEN_BUDGET:
+                break
+            batch.append(self.pending.pop(0)[:TURN_TOKEN_BUDGET * CHARS_PER_TOKEN])
+            used += cost
+        return batch
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
+                batch = self._take_batch()
+                previous = self.summary
+            try:
+                with telemetry.span("summarize"):
+                    summary = self.summarize("\n".join(batch), previous)
+            except Exception as e:
+                print("Summary error:", e)
+                with self.lock:
+                    # Keep the turns for the next attempt
+                    self.pending[:0] = batch
+                    self.running = False
+                return
+            with self.lock:
+                self.summary = summary
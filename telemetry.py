@@ -0,0 +1,181 @@
+# telemetry.py
+# Span timings for each conversation turn. Every span is added to the
+# current turn's breakdown (written as one JSON line when the turn ends) and
+# to a per-span histogram served in Prometheus text format. Registered
+# counters (e.g. LLM token totals) go into both as well.
+import bisect
+import contextlib
+import functools
+import http.server
+import json
+import threading
+import time
+
+TELEMETRY_FILE = "turn_timings.jsonl"  # one JSON object per turn; None disables
+METRICS_PORT = None  # e.g. 9464 to serve histograms at http://localhost:9464/metrics
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def lines(self, name, labels=""):
+        sep = "," if labels else ""
+        cumulative = 0
+        for le, n in zip(self.buckets, self.counts):
+            cumulative += n
+            yield f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum:.6f}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class Telemetry:
+    """Collects spans into per-turn breakdowns and aggregate histograms.
+
+    Spans finished between turns (e.g. speech recognition, which completes
+    before the turn it starts) are carried into the next turn. Safe to use
+    from the pipeline, summarizer and microphone threads.
+    """
+
+    def __init__(self, path=TELEMETRY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.turn = None
+        self.pending = {}
+        self.turns = 0
+        self.spans = {}  # span name -> Histogram
+        self.turn_seconds = Histogram()
+        self.counters = []  # callables returning {name: cumulative value}
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.spans.setdefault(name, Histogram()).observe(seconds)
+            target = self.turn["spans"] if self.turn else self.pending
+            entry = target.setdefault(name, {"ms": 0.0, "count": 0})
+            entry["ms"] += seconds * 1000
+            entry["count"] += 1
+
+    @contextlib.contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator form of `span`."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def register_counters(self, collect):
+        """Export `collect()`, a {name: cumulative value} dict, with each turn record and scrape."""
+        with self.lock:
+            self.counters.append(collect)
+
+    def _collect(self):
+        values = {}
+        for collect in self.counters:
+            values.update(collect())
+        return values
+
+    def begin_turn(self, **fields):
+        with self.lock:
+            self.turns += 1
+            self.turn = {"turn": self.turns, "time": time.time(), "started": time.perf_counter(),
+                         "fields": fields, "spans": self.pending}
+            self.pending = {}
+
+    def annotate(self, **fields):
+        """Attach fields (e.g. the action name) to the current turn's record."""
+        with self.lock:
+            if self.turn:
+                self.turn["fields"].update(fields)
+
+    def end_turn(self):
+        """Close the current turn and append its breakdown to `path`; returns the record."""
+        with self.lock:
+            turn, self.turn = self.turn, None
+            if turn is None:
+                return None
+            total = time.perf_counter() - turn["started"]
+            self.turn_seconds.observe(total)
+            record = {
+                "turn": turn["turn"],
+                "time": round(turn["time"], 3),
+                **turn["fields"],
+                "total_ms": round(total * 1000, 2),
+                "spans": {name: {"ms": round(s["ms"], 2), "count": s["count"]}
+                          for name, s in turn["spans"].items()},
+            }
+            if self.counters:
+                record["counters"] = self._collect()
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def render_prometheus(self):
+        """All histograms in the Prometheus text exposition format."""
+        with self.lock:
+            lines = [
+                "# HELP scheduler_turn_seconds Time from a finished utterance to the end of the reply.",
+                "# TYPE scheduler_turn_seconds histogram",
+                *self.turn_seconds.lines("scheduler_turn_seconds"),
+                "# HELP scheduler_span_seconds Time spent per pipeline stage or external call.",
+                "# TYPE scheduler_span_seconds histogram",
+            ]
+            for name in sorted(self.spans):
+                lines.extend(self.spans[name].lines("scheduler_span_seconds", f'span="{name}"'))
+            for name, value in sorted(self._collect().items()):
+                lines += [f"# TYPE scheduler_{name}_total counter", f"scheduler_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=METRICS_PORT):
+        """Serve `render_prometheus()` at /metrics on a daemon thread; no-op without a port."""
+        if not port:
+            return None
+        telemetry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics at http://127.0.0.1:{port}/metrics")
+        return server
+
+
+telemetry = Telemetry()
@@ -0,0 +1,65 @@
+# token_budget.py
+# Token accounting for LLM calls: estimates what each call sends and trims
+# chat history to a budget instead of a fixed message count.
+import threading
+
+CHARS_PER_TOKEN = 4  # rough estimate, good enough for budgeting
+MESSAGE_OVERHEAD = 4  # role and separator tokens per chat message
+HISTORY_TOKEN_BUDGET = 1500  # non-system messages kept per call
+
+totals = {
+    "calls": 0,
+    "estimated_prompt_tokens": 0,
+    "api_prompt_tokens": 0,
+    "api_completion_tokens": 0,
+}
+_lock = threading.Lock()  # usage also arrives from background stream drains
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+def trim_history(messages, budget=HISTORY_TOKEN_BUDGET):
+    """Keep system messages plus the newest other messages that fit in `budget` tokens.
+
+    The newest message is always kept, even if it alone exceeds the budget.
+    """
+    system = [m for m in messages if m["role"] == "system"]
+    history = [m for m in messages if m["role"] != "system"]
+    kept, used = [], 0
+    for message in reversed(history):
+        cost = message_tokens(message)
+        if kept and used + cost > budget:
+            break
+        kept.append(message)
+        used += cost
+    return system + kept[::-1]
+
+def measure(messages, summary=""):
+    """Estimated token breakdown of one call; also added to `totals`."""
+    system = sum(message_tokens(m) for m in messages if m["role"] == "system")
+    history = sum(message_tokens(m) for m in messages if m["role"] != "system")
+    breakdown = {
+        "system": system,
+        "summary": estimate_tokens(summary) if summary else 0,
+        "history": history,
+        "total": system + history,
+    }
+    with _lock:
+        totals["calls"] += 1
+        totals["estimated_prompt_tokens"] += breakdown["total"]
+    return breakdown
+
+def record_api_usage(usage):
+    """Add the `usage` block of a Mistral response to `totals`."""
+    if usage:
+        with _lock:
+            totals["api_prompt_tokens"] += usage.get("prompt_tokens", 0)
+            totals["api_completion_tokens"] += usage.get("completion_tokens", 0)
+
+def snapshot():
+    """A consistent copy of `totals`."""
+    with _lock:
+        return dict(totals)
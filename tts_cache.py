@@ -0,0 +1,60 @@
+# tts_cache.py
+import hashlib
+import os
+import threading
+
+TTS_CACHE_DIR = ".tts_cache"
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+class AudioCache:
+    """Content-addressed on-disk cache of synthesized audio (text + voice id -> bytes).
+
+    File mtimes double as LRU order: hits touch the file, and the oldest
+    files are evicted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _path(self, text, voice_id):
+        digest = hashlib.sha256(f"{voice_id}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".mp3")
+
+    def get(self, text, voice_id):
+        path = self._path(text, voice_id)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+            return audio
+        except OSError:
+            return None
+
+    def put(self, text, voice_id, audio):
+        if not audio:
+            return
+        path = self._path(text, voice_id)
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".mp3"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
@@ -1,38 +1,192 @@
 # voice_utils.py
+import contextlib
+import queue
+import re
+import threading
+import time
 import speech_recognition as sr
-from elevenlabs import play, generate
+from elevenlabs import play, generate, stream, is_installed
 from config import ELEVEN_API_KEY, ELEVENLABS_VOICE_ID
+from stt import get_backend
+from telemetry import telemetry
+from tts_cache import AudioCache
 
 import elevenlabs
 elevenlabs.set_api_key(ELEVEN_API_KEY)
 
-def transcribe():
-    recognizer = sr.Recognizer()
-    mic = sr.Microphone()
-    with mic as source:
-        print("🎤 Adjusting for ambient noise...")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
+audio_cache = AudioCache()
 
-        print("🎤 Listening (up to 15s)...")
-        audio = recognizer.listen(source, timeout=5, phrase_time_limit=15)
+PHRASE_TIME_LIMIT = 15  # seconds; longest single utterance
+PAUSE_THRESHOLD = 0.6  # seconds of silence that end an utterance
+STT_BACKEND = "google"  # or "vosk" for offline recognition on the CPU
 
+
+class MicrophoneSession:
+    """Long-lived microphone capture that calibrates once and listens in the background.
+
+    Finished utterances are recognized on the listener thread and queued for
+    `transcribe`. Backends that decode incrementally (Vosk) are fed raw chunks
+    instead, printing partial results as the user speaks. Audio heard while
+    muted (i.e. while we are speaking) is dropped.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend(STT_BACKEND)
+        self.recognizer = sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True  # keeps adapting to room noise
+        self.recognizer.pause_threshold = PAUSE_THRESHOLD
+        self.microphone = sr.Microphone(sample_rate=self.backend.sample_rate)
+        self.utterances = queue.Queue()
+        self.muted = threading.Event()
+        self.unmuted_at = 0.0
+        self._stop_listening = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self.backend.streaming:
+            threading.Thread(target=self._stream_loop, daemon=True).start()
+            print(f"🎤 Streaming to {self.backend.name}...")
+            return
+        with self.microphone as source:
+            print("🎤 Adjusting for ambient noise (once)...")
+            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self._stop_listening = self.recognizer.listen_in_background(
+            self.microphone, self._on_phrase, phrase_time_limit=PHRASE_TIME_LIMIT
+        )
+        print(f"🎤 Listening in the background (up to {PHRASE_TIME_LIMIT}s per phrase)...")
+
+    def stop(self):
+        self._stopped.set()
+        if self._stop_listening:
+            self._stop_listening(wait_for_stop=False)
+            self._stop_listening = None
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Ignore the microphone for the duration of the block."""
+        self.muted.set()
+        try:
+            yield
+        finally:
+            self.unmuted_at = time.monotonic()
+            self.muted.clear()
+
+    def _on_phrase(self, recognizer, audio):
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        if self.muted.is_set() or time.monotonic() - duration < self.unmuted_at:
+            return  # overlaps our own speech
+        with telemetry.span(f"stt.{self.backend.name}"):
+            text = self.backend.transcribe(audio)
+        if not text:
+            return
+        print(f"📝 Transcribed ({self.backend.name}): {text}")
+        self.utterances.put(text.lower().strip())
+
+    def _chunks(self, source):
+        while not self._stopped.is_set():
+            chunk = source.stream.read(source.CHUNK)
+            if not self.muted.is_set():
+                yield chunk
+
+    def _stream_loop(self):
+        with self.microphone as source:
+            for text, final in self.backend.stream(self._chunks(source)):
+                if not final:
+                    print(f"\r… {text}", end="", flush=True)
+                    continue
+                print(f"\r📝 Transcribed ({self.backend.name}): {text}")
+                self.utterances.put(text.lower().strip())
+
+    def next_utterance(self, timeout=None):
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return ""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_microphone_session():
+    """The shared MicrophoneSession, started on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = MicrophoneSession()
+            _session.start()
+    return _session
+
+def _mic_paused():
+    return _session.paused() if _session is not None else contextlib.nullcontext()
+
+def transcribe(timeout=None):
+    """Next finished utterance from the background microphone session ("" on timeout)."""
+    return get_microphone_session().next_utterance(timeout)
+
+def split_sentences(text):
+    """Split text at sentence ends so each sentence can be synthesized separately."""
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+def _synthesize(sentence):
+    """Whole-clip audio for one sentence, from the cache when possible."""
+    audio = audio_cache.get(sentence, ELEVENLABS_VOICE_ID)
+    if audio is None:
+        with telemetry.span("elevenlabs.generate"):
+            audio = generate(text=sentence, voice=ELEVENLABS_VOICE_ID, api_key=ELEVEN_API_KEY)
+        audio_cache.put(sentence, ELEVENLABS_VOICE_ID, audio)
+    return audio
+
+def _synthesize_ahead(sentences, chunks):
+    """Producer: stream audio for each sentence in turn onto `chunks`, then a None sentinel."""
     try:
-        text = recognizer.recognize_google(audio, language="en-IN")
-        print(f"📝 Transcribed: {text}")
-        return text.lower().strip()
-    except sr.UnknownValueError:
-        return "Sorry, I couldn't understand."
-    except sr.RequestError as e:
-        return f"STT error: {e}"
+        for sentence in sentences:
+            cached = audio_cache.get(sentence, ELEVENLABS_VOICE_ID)
+            if cached is not None:
+                chunks.put(cached)
+                continue
+            parts = []
+            with telemetry.span("elevenlabs.stream"):
+                for chunk in generate(
+                    text=sentence,
+                    voice=ELEVENLABS_VOICE_ID,
+                    api_key=ELEVEN_API_KEY,
+                    stream=True
+                ):
+                    parts.append(chunk)
+                    chunks.put(chunk)
+            audio_cache.put(sentence, ELEVENLABS_VOICE_ID, b"".join(parts))
+    except Exception as e:
+        print(f"❌ TTS error: {e}")
+    finally:
+        chunks.put(None)
 
 def speak(text):
+    """Speak `text`, starting playback on the first audio chunk.
+
+    Sentences are synthesized on a background thread, so sentence N+1 is
+    being generated while sentence N plays; cached sentences play without
+    a network call. Falls back to whole-clip playback when mpv (needed for
+    streaming) isn't installed.
+    """
+    print(f"🗣️ Speaking: {text}")
     try:
-        audio = generate(
-            text=text,
-            voice=ELEVENLABS_VOICE_ID,
-            api_key=ELEVEN_API_KEY
-        )
-        print(f"🗣️ Speaking: {text}")
-        play(audio)
+        with _mic_paused(), telemetry.span("tts"):
+            if not is_installed("mpv"):
+                for sentence in split_sentences(text):
+                    play(_synthesize(sentence))
+                return
+            chunks = queue.Queue()
+            threading.Thread(target=_synthesize_ahead, args=(split_sentences(text), chunks), daemon=True).start()
+            stream(iter(chunks.get, None))
     except Exception as e:
         print(f"❌ TTS error: {e}")
+
+def warm_tts_cache(phrases):
+    """Synthesize any of `phrases` that aren't cached yet, so they play instantly later."""
+    for phrase in phrases:
+        for sentence in split_sentences(phrase):
+            try:
+                _synthesize(sentence)
+            except Exception as e:
+                print(f"❌ TTS warm-up error: {e}")
+                return